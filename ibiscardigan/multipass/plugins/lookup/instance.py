@@ -0,0 +1,59 @@
+"""Ansible lookup plugin for reading Multipass instance attributes.
+
+Every call in a process shares one memoized `multipass info` snapshot, so
+rendering a template that looks up many instances costs a single CLI call.
+
+Usage:
+    {{ lookup('ibiscardigan.multipass.instance', 'web-*', attr='ipv4') }}
+    {{ query('ibiscardigan.multipass.instance', 'db-1', attr='state') }}
+    {{ lookup('ibiscardigan.multipass.instance', '*', refresh=true) }}
+    {{ lookup('ibiscardigan.multipass.instance', ip='10.0.0.5', attr='name') }}
+    {{ query('ibiscardigan.multipass.instance', 'web-*', attr='ipv4', address=placement_address) }}
+
+Options:
+    address: Remote daemon address (host:port) to query, e.g. a fleet placement address.
+    attr: Attribute to extract from each matched instance: name, state, ipv4, release, image_hash,
+        cpu_count, memory_total, disk_total or mounts. Defaults to all of them as a dict.
+    ip: Select the instance owning this IPv4 address instead of matching names.
+    refresh: Re-query multipass instead of using the memoized snapshot.
+"""
+
+from ansible.errors import AnsibleError
+from ansible.module_utils.parsing.convert_bool import boolean
+from ansible.plugins.lookup import LookupBase
+from ansible_collections.ibiscardigan.multipass.plugins.module_utils import (  # pylint: disable=import-error
+    core,
+    types,
+)
+
+_OPTIONS = ("address", "attr", "ip", "refresh")
+
+
+class LookupModule(LookupBase):
+    """Looks up Multipass instances by name glob."""
+
+    def run(self, terms, variables=None, **kwargs):  # pylint: disable=unused-argument
+        unknown = set(kwargs) - set(_OPTIONS)
+        if unknown:
+            names = ", ".join(sorted(unknown))
+            raise AnsibleError(f"Unsupported option(s) for multipass instance lookup: {names}")
+
+        try:
+            refresh = boolean(kwargs.get("refresh", False))
+        except TypeError as exc:
+            raise AnsibleError(f"Invalid value for 'refresh': {exc}") from exc
+
+        try:
+            address = kwargs.get("address")
+            index = core.get_index(refresh=refresh, address=address)
+        except types.MultipassCLIError as exc:
+            raise AnsibleError(f"Failed to list multipass instances: {exc}") from exc
+
+        if kwargs.get("ip"):
+            record = index.by_ip(kwargs["ip"])
+            return core.record_values([record] if record else [], attr=kwargs.get("attr"))
+
+        results = []
+        for pattern in terms or ["*"]:
+            results.extend(core.select_instances(index, pattern, attr=kwargs.get("attr")))
+        return results
@@ -3,20 +3,23 @@
 import os
 import subprocess
 import json
-from typing import TYPE_CHECKING
+from typing import IO, TYPE_CHECKING, Optional
 
-from . import types
+from . import log, types
 
 if TYPE_CHECKING:
     from ansible.module_utils.basic import AnsibleModule
 
 
-def run_multipass_command(
+def run_multipass_command(  # pylint: disable=too-many-arguments
     args: list[str],
     check: bool = True,
     capture_output: bool = True,
     json_output: bool = False,
     module: "AnsibleModule" = None,
+    *,
+    stdin: Optional[IO[bytes]] = None,
+    address: Optional[str] = None,
 ) -> dict[str, object]:
     """
     Runs a multipass CLI command and returns structured output.
@@ -27,6 +30,9 @@ def run_multipass_command(
         capture_output: Whether to capture stdout/stderr.
         json_output: If true, parse and include 'json' key in the result.
         module: Optional AnsibleModule for safe logging.
+        stdin: Optional binary file object streamed to the command's stdin.
+        address: Optional remote daemon address (host:port), passed to the client as
+            MULTIPASS_SERVER_ADDRESS. Remote commands always use the CLI.
 
     Returns:
         A dictionary with keys: rc, stdout, stderr, and optionally json.
@@ -35,23 +41,28 @@ def run_multipass_command(
         MultipassCLIError: If the command fails or output can't be parsed.
     """
     base_cmd = ["multipass"] + args
-    _log_debug(module, f"Executing: {' '.join(base_cmd)}")
+    logger = log.get_logger("cli", module)
+    logger.debug("exec", args=lambda: log.redact_args(args), address=address or "local")
 
     try:
         env = os.environ.copy()
         env["PATH"] = env.get("PATH", "") + ":/opt/homebrew/bin:/usr/local/bin"
+        if address:
+            env["MULTIPASS_SERVER_ADDRESS"] = address
         result = subprocess.run(
             base_cmd,
             capture_output=capture_output,
             text=True,
+            stdin=stdin,
             check=False,
+            env=env,
         )
     except FileNotFoundError:
-        _log_and_raise(module, "multipass binary not found in PATH")
+        _log_and_raise(logger, "binary_not_found", "multipass binary not found in PATH")
     except (subprocess.SubprocessError, OSError) as exc:
-        _log_and_raise(module, f"Unexpected error running multipass: {exc}")
+        _log_and_raise(logger, "exec_error", f"Unexpected error running multipass: {exc}")
 
-    return _process_result(result, base_cmd, check, json_output, module)
+    return _process_result(result, base_cmd, check, json_output, logger)
 
 
 def _process_result(
@@ -59,24 +70,26 @@ def _process_result(
     base_cmd: list[str],
     check: bool,
     json_output: bool,
-    module: "AnsibleModule",
+    logger: log.Logger,
 ) -> dict[str, object]:
-    stdout = result.stdout.strip() if result.stdout else ""
-    stderr = result.stderr.strip() if result.stderr else ""
+    stdout = _decode(result.stdout)
+    stderr = _decode(result.stderr)
 
-    _log_debug(module, f"Command returned code {result.returncode}")
-    if stdout:
-        _log_debug(module, f"stdout: {stdout}")
-    if stderr:
-        _log_debug(module, f"stderr: {stderr}")
+    logger.debug("result", rc=result.returncode, stdout=stdout, stderr=stderr)
 
     if check and result.returncode != 0:
-        msg = (
+        logger.error(
+            "command_failed",
+            args=lambda: log.redact_args(base_cmd[1:]),
+            rc=result.returncode,
+            stdout=stdout,
+            stderr=stderr,
+        )
+        raise types.MultipassCLIError(
             f"multipass command failed: {' '.join(base_cmd)}\n"
             f"Exit code: {result.returncode}\n"
             f"Stdout: {stdout}\nStderr: {stderr}"
         )
-        _log_and_raise(module, msg)
 
     output: dict[str, object] = {
         "rc": result.returncode,
@@ -87,21 +100,23 @@ def _process_result(
     if json_output:
         try:
             output["json"] = json.loads(stdout)
-            _log_debug(module, "Successfully parsed JSON output")
         except json.JSONDecodeError:
-            _log_and_raise(module, f"Failed to parse JSON output: {stdout}")
+            logger.error("json_parse_failed", msg="Failed to parse JSON output", stdout=stdout)
+            raise types.MultipassCLIError(f"Failed to parse JSON output: {stdout}") from None
 
     return output
 
 
-def _log_debug(module: "AnsibleModule", msg: str) -> None:
-    """Log a debug message to the provided AnsibleModule, if set."""
-    if module:
-        module.log(f"[cli] {msg}")
+def _decode(stream: "str | bytes | None") -> str:
+    """Return stripped text for a captured stream, decoding bytes if needed."""
+    if not stream:
+        return ""
+    if isinstance(stream, bytes):
+        stream = stream.decode("utf-8", errors="replace")
+    return stream.strip()
 
 
-def _log_and_raise(module: "AnsibleModule", msg: str) -> None:
-    """Log an error and raise a MultipassCLIError."""
-    if module:
-        module.log(f"[cli] {msg}")
+def _log_and_raise(logger: log.Logger, event: str, msg: str) -> None:
+    """Log an error record and raise a MultipassCLIError."""
+    logger.error(event, msg=msg)
     raise types.MultipassCLIError(msg)
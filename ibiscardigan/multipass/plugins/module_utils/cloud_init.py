@@ -0,0 +1,133 @@
+"""Cloud-init user data validation and content-addressed caching."""
+
+import hashlib
+import os
+import tempfile
+import traceback
+from typing import Any, Optional
+
+from . import types
+
+try:
+    import yaml
+
+    HAS_YAML = True
+    YAML_IMPORT_ERROR = None
+except ImportError:  # pragma: no cover
+    HAS_YAML = False
+    YAML_IMPORT_ERROR = traceback.format_exc()
+
+CACHE_DIR_ENV = "MULTIPASS_CLOUD_INIT_CACHE"
+
+_HEADER = "#cloud-config"
+
+
+def is_inline(value: str) -> bool:
+    """Return True if `value` is user data content rather than a file path."""
+    return "\n" in value or value.lstrip().startswith(_HEADER)
+
+
+def load(value: str) -> str:
+    """
+    Returns cloud-init content from inline text or a file path.
+
+    Args:
+        value: Inline `#cloud-config` content, or a path to a file containing it.
+
+    Returns:
+        The user data content.
+
+    Raises:
+        FileNotFoundError: If `value` is a path that does not exist.
+    """
+    if is_inline(value):
+        return value
+    if not os.path.isfile(value):
+        raise FileNotFoundError(f"Cloud-init file not found: {value}")
+    with open(value, encoding="utf-8") as handle:
+        return handle.read()
+
+
+def validate(content: str) -> dict[str, Any]:
+    """
+    Validates cloud-config user data before it is handed to `multipass launch`.
+
+    Only `#cloud-config` content is checked. Other user data formats (shell
+    scripts, `## template: jinja`, `#include`, MIME multipart) are left for
+    cloud-init to interpret.
+
+    Args:
+        content: The user data content.
+
+    Returns:
+        The parsed cloud-config mapping (empty for other formats).
+
+    Raises:
+        CloudInitError: If `#cloud-config` content is not a YAML mapping.
+        ImportError: If `#cloud-config` content is given and PyYAML is not installed.
+    """
+    first_line = content.lstrip().split("\n", 1)[0].strip()
+    if first_line != _HEADER:
+        return {}
+    if not HAS_YAML:
+        raise ImportError("PyYAML is required to validate #cloud-config content")
+
+    try:
+        parsed = yaml.safe_load(content)
+    except yaml.YAMLError as exc:
+        raise types.CloudInitError(f"Cloud-init content is not valid YAML: {exc}") from exc
+
+    if parsed is None:
+        return {}
+    if not isinstance(parsed, dict):
+        raise types.CloudInitError("Cloud-init content must be a YAML mapping")
+    return parsed
+
+
+def content_hash(content: str) -> str:
+    """Return the sha256 hex digest of the user data content."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def prepare(value: str, cache_dir: Optional[str] = None) -> tuple[str, str]:
+    """
+    Loads, validates and (for inline content) caches cloud-init user data.
+
+    Inline content is written once to `<cache_dir>/<sha256>.yaml`, so every
+    instance sharing a config reuses the same file. The directory is created if
+    missing. There is no default: it must be readable by the multipass client,
+    which for the snap package rules out hidden paths and /tmp. File paths are
+    validated and passed through unchanged.
+
+    Args:
+        value: Inline content or a file path.
+        cache_dir: Cache directory; defaults to $MULTIPASS_CLOUD_INIT_CACHE.
+
+    Returns:
+        A tuple of (path to pass to `--cloud-init`, sha256 of the content).
+
+    Raises:
+        FileNotFoundError: If a path was given and does not exist.
+        CloudInitError: If the content fails validation, or is inline and no cache directory is set.
+    """
+    content = load(value)
+    validate(content)
+    digest = content_hash(content)
+
+    if not is_inline(value):
+        return value, digest
+
+    cache_dir = cache_dir or os.environ.get(CACHE_DIR_ENV)
+    if not cache_dir:
+        raise types.CloudInitError(
+            f"Inline cloud-init content needs cloud_init_cache_dir or ${CACHE_DIR_ENV} to be set"
+        )
+    cache_dir = os.path.expanduser(cache_dir)
+    path = os.path.join(cache_dir, f"{digest}.yaml")
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(content)
+        os.replace(tmp_path, path)
+    return path, digest
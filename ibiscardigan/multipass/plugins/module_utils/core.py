@@ -1,20 +1,34 @@
 """Core multipass VM state logic."""
 
-import os
-from typing import TYPE_CHECKING, Any
-from . import cli, types
+import fnmatch
+import threading
+from typing import TYPE_CHECKING, Any, Optional
+from . import cli, cloud_init, log, mounts, types
 
 if TYPE_CHECKING:  # pragma: no cover
     from ansible.module_utils.basic import AnsibleModule
 
+# Guest-visible memory and root filesystem size are smaller than the configured
+# values, so a reported size this close to the request counts as matching.
+_SIZE_TOLERANCE = 0.8
 
-def get_info(name: str, module: "AnsibleModule" = None) -> dict[str, Any] | None:
+# Process-wide memo of the last `multipass info` snapshot per daemon address, shared by lookups.
+_SNAPSHOT: dict[Optional[str], types.InstanceIndex] = {}
+_SNAPSHOT_LOCK = threading.Lock()
+
+
+def get_info(
+    name: str,
+    module: "AnsibleModule" = None,
+    address: Optional[str] = None,
+) -> dict[str, Any] | None:
     """
     Returns parsed info for a multipass instance, or None if it doesn't exist.
 
     Args:
         name: The name of the instance.
         module: Optional AnsibleModule for logging.
+        address: Optional remote daemon address; defaults to the local daemon.
 
     Returns:
         A dictionary with VM details, or None if not found.
@@ -24,14 +38,14 @@ def get_info(name: str, module: "AnsibleModule" = None) -> dict[str, Any] | None
             ["info", name, "--format", "json"],
             json_output=True,
             module=module,
+            address=address,
         )
         json_data = result.get("json", {})
         vm_info = json_data.get("info", {}).get(name)
         return vm_info
     except types.MultipassCLIError as exc:
         if "instance not found" in str(exc).lower() or "does not exist" in str(exc).lower():
-            if module:
-                module.log(f"VM '{name}' not found.")
+            log.get_logger("core", module).debug("vm_not_found", name=name)
             return None
         raise
 
@@ -39,32 +53,97 @@ def get_info(name: str, module: "AnsibleModule" = None) -> dict[str, Any] | None
 def ensure_present(
     config: types.VMConfig,
     module: "AnsibleModule" = None,
+    cloud_init_cache_dir: Optional[str] = None,
+    address: Optional[str] = None,
 ) -> dict[str, Any]:
     """
     Ensures the specified multipass instance is present.
 
     If the instance does not exist, it will be created using the given parameters.
+    Cloud-init user data is validated before anything else so a bad config fails
+    without a launch. If `config.mounts` is set, mounts are reconciled against it.
+    Existing instances are not resized: cpus, memory or disk that differ from
+    `config` are only reported as warnings.
 
     Args:
         config: A VMConfig object describing the instance.
         module: Optional AnsibleModule for safe logging.
+        cloud_init_cache_dir: Optional directory for cached inline cloud-init content.
+        address: Optional remote daemon address; defaults to the local daemon.
 
     Returns:
         A dictionary with:
             - changed (bool)
             - msg (str)
             - info (dict) if available
+            - plan (list) with the plan_instance() entry for the info read before any change
+            - cloud_init_hash (str) if cloud-init was given
+            - mounts (dict) with added/removed targets, if any changed
+            - warnings (list[str]) if an existing instance's size differs from `config`,
+              or a kept mount's requested type cannot be verified
     """
-    existing = get_info(config.name, module=module)
+    logger = log.get_logger("core", module)
+    cloud_init_path = cloud_init_hash = None
+    if config.cloud_init:
+        try:
+            cloud_init_path, cloud_init_hash = cloud_init.prepare(
+                config.cloud_init,
+                cache_dir=cloud_init_cache_dir,
+            )
+        except (FileNotFoundError, types.CloudInitError) as exc:
+            _fail(module, exc)
+            raise
+
+    existing = get_info(config.name, module=module, address=address)
+    entry = plan_instance(config.name, config, existing)
     if existing:
-        if module:
-            module.log(f"[core] VM '{config.name}' already exists.")
-        return {
+        logger.info("vm_exists", name=config.name)
+        if entry["drift"]:
+            logger.warning("size_drift", name=config.name, fields=sorted(entry["drift"]))
+        result = {
             "changed": False,
             "msg": f"VM '{config.name}' already exists",
             "info": existing,
         }
+    else:
+        cmd = _launch_command(config, cloud_init_path, cloud_init_hash, logger)
+        logger.info("vm_create", name=config.name, args=lambda: log.redact_args(cmd))
+        cli.run_multipass_command(
+            cmd,
+            check=True,
+            capture_output=True,
+            module=module,
+            address=address,
+        )
+        result = {
+            "changed": True,
+            "msg": f"VM '{config.name}' created",
+            "info": get_info(config.name, module=module, address=address),
+        }
 
+    result["plan"] = [entry]
+    if cloud_init_hash:
+        result["cloud_init_hash"] = cloud_init_hash
+    if entry["warnings"]:
+        result["warnings"] = entry["warnings"]
+    if _reconcile_mounts(config, result, module, address) and existing:
+        result["msg"] = f"VM '{config.name}' updated"
+    return result
+
+
+def _fail(module: Optional["AnsibleModule"], exc: Exception) -> None:
+    """Fail the module with `exc`, if there is one; callers re-raise otherwise."""
+    if module:
+        module.fail_json(msg=f"[core] {exc}")
+
+
+def _launch_command(
+    config: types.VMConfig,
+    cloud_init_path: Optional[str],
+    cloud_init_hash: Optional[str],
+    logger: log.Logger,
+) -> list[str]:
+    """Build the `multipass launch` arguments for `config`."""
     cmd = ["launch", config.image, "--name", config.name]
 
     if config.cpus:
@@ -76,82 +155,445 @@ def ensure_present(
 
     if config.network:
         cmd += ["--network", config.network]
-        if module:
-            module.log(f"[core] Attaching VM to network interface: {config.network}")
+        logger.debug("attach_network", name=config.name, network=config.network)
 
-    if config.cloud_init:
-        if not os.path.exists(config.cloud_init):
-            msg = f"[core] Cloud-init file not found: {config.cloud_init}"
-            if module:
-                module.fail_json(msg=msg)
-            raise FileNotFoundError(msg)
-        cmd += ["--cloud-init", config.cloud_init]
-        if module:
-            module.log(f"[core] Using cloud-init config: {config.cloud_init}")
+    if cloud_init_path:
+        cmd += ["--cloud-init", cloud_init_path]
+        logger.debug("cloud_init", name=config.name, path=cloud_init_path, sha256=cloud_init_hash)
+    return cmd
 
-    if module:
-        module.log(f"[core] Creating VM '{config.name}' with command: multipass {' '.join(cmd)}")
 
-    cli.run_multipass_command(cmd, check=True, capture_output=True, module=module)
+def _drift_warning(name: str, drift: dict[str, dict[str, Any]]) -> str:
+    """Describe size fields that differ on an existing VM and are left unchanged."""
+    fields = []
+    for field, change in drift.items():
+        fields.append(f"{field} {change['before']} (requested {change['after']})")
+    return f"VM '{name}' differs from the requested size and was not resized: {', '.join(fields)}"
 
-    info = get_info(config.name, module=module)
 
-    return {
-        "changed": True,
-        "msg": f"VM '{config.name}' created",
-        "info": info,
-    }
+def _reconcile_mounts(
+    config: types.VMConfig,
+    result: dict[str, Any],
+    module: "AnsibleModule",
+    address: Optional[str],
+) -> bool:
+    """
+    Apply config.mounts against result["info"], updating `result` in place.
 
+    Returns True if any mount changed.
+    """
+    if config.mounts is None:
+        return False
+    changes = mounts.ensure_mounts(
+        config.name,
+        config.mounts,
+        result["info"] or {},
+        module=module,
+        address=address,
+    )
+    if not changes["changed"]:
+        return False
+    result["changed"] = True
+    result["mounts"] = {"added": changes["added"], "removed": changes["removed"]}
+    result["info"] = get_info(config.name, module=module, address=address)
+    return True
 
-def ensure_absent(name: str, module: "AnsibleModule" = None) -> dict[str, Any]:
+
+def ensure_absent(
+    name: str,
+    module: "AnsibleModule" = None,
+    address: Optional[str] = None,
+) -> dict[str, Any]:
     """
     Ensures the given VM does not exist. Deletes it if present.
 
     Args:
         name: The name of the VM to delete.
         module: Optional AnsibleModule for logging.
+        address: Optional remote daemon address; defaults to the local daemon.
 
     Returns:
         A dictionary with:
             - changed (bool)
             - msg (str)
+            - plan (list) with the plan_instance() entry for the info read before deleting
     """
-    info = get_info(name, module=module)
+    logger = log.get_logger("core", module)
+    info = get_info(name, module=module, address=address)
+    entry = plan_instance(name, None, info)
     if info is None:
-        if module:
-            module.log(f"[core] VM '{name}' does not exist. No action needed.")
-        return {"changed": False, "msg": f"VM '{name}' is already absent"}
+        logger.info("vm_absent", name=name)
+        return {"changed": False, "msg": f"VM '{name}' is already absent", "plan": [entry]}
 
-    if module:
-        module.log(f"[core] Deleting VM '{name}'")
+    logger.info("vm_delete", name=name)
 
-    cli.run_multipass_command(["delete", name], check=True, module=module)
-    cli.run_multipass_command(["purge"], check=True, module=module)
+    cli.run_multipass_command(["delete", name], check=True, module=module, address=address)
+    cli.run_multipass_command(["purge"], check=True, module=module, address=address)
 
-    return {"changed": True, "msg": f"VM '{name}' was deleted"}
+    return {"changed": True, "msg": f"VM '{name}' was deleted", "plan": [entry]}
 
 
-def list_instances(module: "AnsibleModule" = None) -> dict[str, Any]:
+def list_instances(module: "AnsibleModule" = None, address: Optional[str] = None) -> dict[str, Any]:
     """
     Lists all Multipass instances and their information.
 
     Args:
         module: Optional AnsibleModule for logging.
+        address: Optional remote daemon address; defaults to the local daemon.
 
     Returns:
         A dictionary where keys are instance names and values are their info dicts.
     """
-    if module:
-        module.log("[core] Listing all Multipass instances")
+    log.get_logger("core", module).debug("list_instances", address=address or "local")
 
     try:
         result = cli.run_multipass_command(
             ["info", "--format", "json"],
             json_output=True,
             module=module,
+            address=address,
         )
         return result.get("json", {}).get("info", {})
     except types.MultipassCLIError as exc:
         if module:
             module.fail_json(msg=f"Failed to list instances: {exc}")
         raise
+
+
+def get_index(
+    refresh: bool = False,
+    module: "AnsibleModule" = None,
+    address: Optional[str] = None,
+) -> types.InstanceIndex:
+    """
+    Returns a memoized InstanceIndex of all instances, fetched at most once per process and daemon.
+
+    Only the index is kept; the parsed `multipass info` output is dropped once it is built.
+
+    Args:
+        refresh: Discard any cached snapshot and query multipass again.
+        module: Optional AnsibleModule for logging.
+        address: Optional remote daemon address; defaults to the local daemon.
+
+    Returns:
+        An InstanceIndex for lookups by name, IPv4 and state.
+    """
+    with _SNAPSHOT_LOCK:
+        index = _SNAPSHOT.get(address)
+        if refresh or index is None:
+            instances = list_instances(module=module, address=address)
+            index = _SNAPSHOT[address] = types.InstanceIndex.from_snapshot(instances)
+        return index
+
+
+def select_instances(
+    index: types.InstanceIndex,
+    pattern: str = "*",
+    attr: Optional[str] = None,
+) -> list[Any]:
+    """
+    Selects instances whose name matches a glob pattern.
+
+    A pattern without glob characters is a single index lookup.
+
+    Args:
+        index: An InstanceIndex, e.g. from get_index().
+        pattern: A shell-style glob matched against instance names.
+        attr: Optional attribute to extract from each matched instance.
+
+    Returns:
+        The record_values() of the matched records, ordered by instance name.
+    """
+    if any(char in pattern for char in "*?["):
+        records = [index[name] for name in sorted(fnmatch.filter(index.names(), pattern))]
+    else:
+        record = index.get(pattern)
+        records = [record] if record else []
+    return record_values(records, attr)
+
+
+def record_values(records: list[types.InstanceRecord], attr: Optional[str] = None) -> list[Any]:
+    """
+    Extracts lookup results from instance records.
+
+    Args:
+        records: The records to extract from, in order.
+        attr: Optional attribute to extract; "name" or one of InstanceRecord.FIELDS.
+
+    Returns:
+        Without `attr` each item is the record's to_dict() with its `name` added;
+        with `attr` each item is that attribute's value, and list-valued attributes
+        (such as `ipv4`) are flattened into the result. Unreported values are skipped.
+    """
+    selected: list[Any] = []
+    for record in records:
+        if attr is None:
+            selected.append({"name": record.name, **record.to_dict()})
+        elif attr == "name":
+            selected.append(record.name)
+        else:
+            value = record.get(attr)
+            if isinstance(value, list):
+                selected.extend(value)
+            elif value is not None:
+                selected.append(value)
+    return selected
+
+
+def parse_size(size: Optional[str]) -> Optional[int]:
+    """
+    Converts a multipass size string (e.g. "512M", "1.5G", "10GiB") to bytes.
+
+    Args:
+        size: The size string, or None.
+
+    Returns:
+        The size in bytes, or None if `size` is empty.
+
+    Raises:
+        MultipassCLIError: If the string is not a recognised size.
+    """
+    if not size:
+        return None
+    text = str(size).strip().upper().replace("IB", "").rstrip("B")
+    units = {"K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+    multiplier = units.get(text[-1:], 1)
+    number = text[:-1] if text[-1:] in units else text
+    try:
+        return int(float(number) * multiplier)
+    except ValueError:
+        raise types.MultipassCLIError(f"Invalid size: {size}") from None
+
+
+def _size_differs(requested: Optional[str], reported: Optional[int]) -> bool:
+    """Return True if a reported byte size does not match a requested size string."""
+    wanted = parse_size(requested)
+    if wanted is None or reported is None:
+        return False
+    return reported > wanted or reported < wanted * _SIZE_TOLERANCE
+
+
+def _mount_dict(mount: types.MountConfig) -> dict[str, str]:
+    return {"source": mount.source, "target": mount.target, "type": mount.type}
+
+
+def plan_instance(
+    name: str,
+    config: Optional[types.VMConfig],
+    info: Optional[dict[str, Any]],
+) -> dict[str, Any]:
+    """
+    Plans the change needed to bring one instance to its desired state.
+
+    Existing instances are never resized, so cpus, memory or disk that differ
+    from `config` are reported under `drift` and do not mark the entry changed.
+    Sizes multipass does not report (e.g. for a stopped instance) are not compared.
+
+    Args:
+        name: The instance name.
+        config: The desired config, or None if the instance should be absent.
+        info: The instance's current info dict, or None if it does not exist.
+
+    Returns:
+        A dictionary with:
+            - name (str)
+            - action (str): one of create, delete, noop
+            - changes (dict): field -> {"before", "after"}
+            - drift (dict): size field -> {"before", "after"} on an existing instance
+            - mounts (dict): mounts to "add" and "remove", if any differ
+            - warnings (list[str]): for drift and for kept mounts whose requested type
+              cannot be verified
+            - changed (bool)
+    """
+    changes: dict[str, dict[str, Any]] = {}
+    drift: dict[str, dict[str, Any]] = {}
+    entry: dict[str, Any] = {
+        "name": name,
+        "action": "noop",
+        "changes": changes,
+        "drift": drift,
+        "warnings": [],
+    }
+
+    if config is None:
+        if info is not None:
+            entry["action"] = "delete"
+            changes["state"] = {"before": info.get("state"), "after": "absent"}
+        entry["changed"] = entry["action"] != "noop"
+        return entry
+
+    if info is None:
+        entry["action"] = "create"
+        changes["state"] = {"before": "absent", "after": "present"}
+        for field in ("image", "cpus", "memory", "disk", "network"):
+            if getattr(config, field):
+                changes[field] = {"before": None, "after": getattr(config, field)}
+        if config.mounts:
+            entry["mounts"] = {"add": [_mount_dict(mount) for mount in config.mounts], "remove": []}
+        entry["changed"] = True
+        return entry
+
+    record = types.InstanceRecord(name, info)
+    if config.cpus and record.cpu_count is not None and record.cpu_count != config.cpus:
+        drift["cpus"] = {"before": record.cpu_count, "after": config.cpus}
+    if record.memory_total is not None and _size_differs(config.memory, record.memory_total):
+        drift["memory"] = {"before": record.memory_total, "after": config.memory}
+    # multipass can only grow disks, so a disk larger than requested is not drift.
+    wanted_disk = parse_size(config.disk)
+    disk_total = record.disk_total
+    if disk_total is not None and wanted_disk and disk_total < wanted_disk * _SIZE_TOLERANCE:
+        drift["disk"] = {"before": disk_total, "after": config.disk}
+
+    if drift:
+        entry["warnings"].append(_drift_warning(name, drift))
+
+    if config.mounts is not None:
+        mount_plan = mounts.plan_mounts(config.mounts, record)
+        entry["warnings"] += mount_plan["warnings"]
+        if mount_plan["add"] or mount_plan["remove"]:
+            sources = {target: mount["source"] for target, mount in record.mounts.items()}
+            removed = mount_plan["remove"]
+            entry["mounts"] = {
+                "add": [_mount_dict(mount) for mount in mount_plan["add"]],
+                "remove": [{"source": sources[target], "target": target} for target in removed],
+            }
+
+    entry["changed"] = entry["action"] != "noop" or "mounts" in entry
+    return entry
+
+
+def plan(
+    configs: list[types.VMConfig],
+    snapshot: dict[str, Any],
+    absent: Optional[list[str]] = None,
+) -> list[dict[str, Any]]:
+    """
+    Plans create, delete or no-op for many instances from one info snapshot.
+
+    Nothing is executed, so this is safe for check mode.
+
+    Args:
+        configs: Instances that should be present.
+        snapshot: A list_instances() result (or a subset covering the instances involved).
+        absent: Names of instances that should be absent.
+
+    Returns:
+        A list of plan_instance() entries, in the order given.
+    """
+    entries = [plan_instance(config.name, config, snapshot.get(config.name)) for config in configs]
+    entries += [plan_instance(name, None, snapshot.get(name)) for name in absent or []]
+    return entries
+
+
+def render_diff(entries: list[dict[str, Any]]) -> dict[str, str]:
+    """
+    Renders plan entries as an Ansible `diff` with `before` and `after` text.
+
+    Args:
+        entries: Entries from plan() or plan_instance().
+
+    Returns:
+        A dictionary with `before` and `after` strings; unchanged instances are omitted.
+    """
+    before: list[str] = []
+    after: list[str] = []
+    for entry in entries:
+        if not entry["changed"]:
+            continue
+        before.append(f"{entry['name']}:")
+        after.append(f"{entry['name']}:")
+        for field, change in entry["changes"].items():
+            before.append(f"  {field}: {change['before']}")
+            after.append(f"  {field}: {change['after']}")
+        mount_plan = entry.get("mounts")
+        if mount_plan:
+            before += [_mount_line(mount) for mount in mount_plan["remove"]]
+            after += [_mount_line(mount) for mount in mount_plan["add"]]
+    return {"before": _diff_text(before), "after": _diff_text(after)}
+
+
+def _mount_line(mount: dict[str, str]) -> str:
+    return f"  mount: {mount['source']} -> {mount['target']}"
+
+
+def _diff_text(lines: list[str]) -> str:
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+_PLAN_VERBS = {"create": "created", "delete": "deleted", "noop": "updated"}
+
+
+def check(
+    name: str,
+    config: Optional[types.VMConfig],
+    module: "AnsibleModule" = None,
+    address: Optional[str] = None,
+) -> dict[str, Any]:
+    """
+    Check-mode counterpart of ensure_present()/ensure_absent().
+
+    Makes a single read-only info call and never runs a mutating command.
+    Cloud-init content is still validated, but not written to the cache.
+
+    Args:
+        name: The instance name.
+        config: The desired config, or None to check ensure_absent().
+        module: Optional AnsibleModule for logging.
+        address: Optional remote daemon address; defaults to the local daemon.
+
+    Returns:
+        A dictionary with:
+            - changed (bool)
+            - msg (str)
+            - plan (list) with the plan_instance() entry
+            - diff (dict) with before/after text
+            - cloud_init_hash (str) if cloud-init was given
+            - warnings (list[str]) if an existing instance's size differs from `config`,
+              or a kept mount's requested type cannot be verified
+    """
+    cloud_init_hash = None
+    if config is not None:
+        try:
+            cloud_init_hash = check_cloud_init(config)
+        except (FileNotFoundError, types.CloudInitError) as exc:
+            _fail(module, exc)
+            raise
+
+    entry = plan_instance(name, config, get_info(name, module=module, address=address))
+    if entry["changed"]:
+        msg = f"VM '{name}' would be {_PLAN_VERBS[entry['action']]}"
+    else:
+        msg = f"VM '{name}' is already {'absent' if config is None else 'up to date'}"
+
+    result = {
+        "changed": entry["changed"],
+        "msg": msg,
+        "plan": [entry],
+        "diff": render_diff([entry]),
+    }
+    if cloud_init_hash:
+        result["cloud_init_hash"] = cloud_init_hash
+    if entry["warnings"]:
+        result["warnings"] = entry["warnings"]
+    return result
+
+
+def check_cloud_init(config: types.VMConfig) -> Optional[str]:
+    """
+    Validates `config.cloud_init` as check mode does, without writing the cache.
+
+    Args:
+        config: The desired config.
+
+    Returns:
+        The sha256 of the cloud-init content, or None if the config has none.
+
+    Raises:
+        FileNotFoundError: If a cloud-init file path does not exist.
+        CloudInitError: If the content fails validation.
+    """
+    if not config.cloud_init:
+        return None
+    content = cloud_init.load(config.cloud_init)
+    cloud_init.validate(content)
+    return cloud_init.content_hash(content)
@@ -0,0 +1,348 @@
+"""Placement of instances across several multipass hypervisors."""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from . import core, log, types
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ansible.module_utils.basic import AnsibleModule
+
+# multipass launch defaults, used when a config or a stopped instance does not say.
+DEFAULT_CPUS = 1
+DEFAULT_MEMORY = "1G"
+
+
+def _memory(size: str) -> int:
+    return core.parse_size(size) or 0
+
+
+class _WorkerModule:
+    """
+    Stands in for the AnsibleModule inside worker threads.
+
+    Logging goes through the real module, but fail_json() raises MultipassCLIError
+    instead of exiting, so the main thread can collect errors and fail once.
+    """
+
+    __slots__ = ("_module",)
+
+    def __init__(self, module: "AnsibleModule") -> None:
+        self._module = module
+
+    @property
+    def params(self) -> dict[str, Any]:
+        params: dict[str, Any] = self._module.params
+        return params
+
+    def log(self, msg: str) -> None:
+        self._module.log(msg)
+
+    def fail_json(self, msg: str, **_kwargs: Any) -> None:
+        raise types.MultipassCLIError(msg)
+
+
+class HostLoad:
+    """
+    Resources already committed on one hypervisor, from its info snapshot.
+
+    multipass info only reports cpu_count and memory for running instances, so a
+    stopped instance is counted at the launch defaults (DEFAULT_CPUS and
+    DEFAULT_MEMORY) whatever it was launched with. A host with large stopped
+    instances can therefore look emptier than it will be once they start.
+    """
+
+    __slots__ = ("hypervisor", "instances", "cpus", "memory", "cpu_capacity", "memory_capacity")
+
+    def __init__(self, hypervisor: types.HypervisorConfig, snapshot: dict[str, Any]) -> None:
+        self.hypervisor = hypervisor
+        self.instances: list[str] = []
+        self.cpus = 0
+        self.memory = 0
+        self.cpu_capacity = hypervisor.cpus
+        self.memory_capacity = core.parse_size(hypervisor.memory)
+        for record in types.InstanceIndex.from_snapshot(snapshot):
+            self.add(record.name, record.cpu_count, record.memory_total)
+
+    def add(self, name: str, cpus: Optional[int], memory: Optional[int]) -> None:
+        """Account for an instance placed on this host."""
+        self.instances.append(name)
+        self.cpus += cpus or DEFAULT_CPUS
+        self.memory += memory or _memory(DEFAULT_MEMORY)
+
+    def fits(self, cpus: int, memory: int) -> bool:
+        """Return True if the host has capacity for another instance of this size."""
+        if self.cpu_capacity is not None and self.cpus + cpus > self.cpu_capacity:
+            return False
+        if self.memory_capacity is not None and self.memory + memory > self.memory_capacity:
+            return False
+        return True
+
+    def utilisation(self) -> float:
+        """Return the highest of CPU and memory utilisation, or 0.0 if capacity is unknown."""
+        ratios = [0.0]
+        if self.cpu_capacity:
+            ratios.append(self.cpus / self.cpu_capacity)
+        if self.memory_capacity:
+            ratios.append(self.memory / self.memory_capacity)
+        return max(ratios)
+
+
+def _spread(candidates: list[HostLoad]) -> HostLoad:
+    return min(candidates, key=lambda load: len(load.instances))
+
+
+def _pack(candidates: list[HostLoad]) -> HostLoad:
+    return max(candidates, key=lambda load: (load.utilisation(), load.memory))
+
+
+def _least_loaded(candidates: list[HostLoad]) -> HostLoad:
+    return min(candidates, key=lambda load: (load.utilisation(), load.memory))
+
+
+# Each strategy picks one host from the candidates that still have capacity;
+# ties go to the first listed.
+STRATEGIES: dict[str, Callable[[list[HostLoad]], HostLoad]] = {
+    "spread": _spread,
+    "pack": _pack,
+    "least_loaded": _least_loaded,
+}
+
+
+def plan_placement(
+    configs: list[types.VMConfig],
+    loads: list[HostLoad],
+    strategy: str = "spread",
+) -> dict[str, str]:
+    """
+    Assigns every instance to a hypervisor.
+
+    Instances that already exist stay where they are; new ones are placed one at
+    a time with the chosen strategy, updating host load as they go.
+
+    Args:
+        configs: The instances to place.
+        loads: HostLoad for every candidate hypervisor.
+        strategy: A key of STRATEGIES.
+
+    Returns:
+        A dictionary mapping instance name to hypervisor name.
+
+    Raises:
+        PlacementError: If the strategy is unknown or an instance fits on no host.
+    """
+    if strategy not in STRATEGIES:
+        raise types.PlacementError(f"Unknown placement strategy: {strategy}")
+    choose = STRATEGIES[strategy]
+
+    placement: dict[str, str] = {}
+    for load in loads:
+        for name in load.instances:
+            placement.setdefault(name, load.hypervisor.name)
+
+    wanted = {config.name for config in configs}
+    placement = {name: host for name, host in placement.items() if name in wanted}
+
+    for config in configs:
+        if config.name in placement:
+            continue
+        cpus = config.cpus or DEFAULT_CPUS
+        memory = _memory(config.memory or DEFAULT_MEMORY)
+        candidates = [load for load in loads if load.fits(cpus, memory)]
+        if not candidates:
+            raise types.PlacementError(f"No hypervisor has capacity for '{config.name}'")
+        chosen = choose(candidates)
+        chosen.add(config.name, cpus, memory)
+        placement[config.name] = chosen.hypervisor.name
+    return placement
+
+
+def _list_on_host(
+    hypervisor: types.HypervisorConfig,
+    module: Optional[_WorkerModule],
+) -> tuple[dict[str, Any], Optional[str]]:
+    try:
+        return core.list_instances(module=module, address=hypervisor.address), None
+    except types.MultipassCLIError as exc:
+        return {}, f"{hypervisor.name}: {exc}"
+
+
+def _ensure_on_host(
+    hypervisor: types.HypervisorConfig,
+    configs: list[types.VMConfig],
+    module: Optional[_WorkerModule],
+    cloud_init_cache_dir: Optional[str],
+) -> dict[str, dict[str, Any]]:
+    results: dict[str, dict[str, Any]] = {}
+    for config in configs:
+        try:
+            results[config.name] = core.ensure_present(
+                config,
+                module=module,
+                cloud_init_cache_dir=cloud_init_cache_dir,
+                address=hypervisor.address,
+            )
+        except (types.MultipassCLIError, types.CloudInitError, FileNotFoundError) as exc:
+            results[config.name] = {"changed": False, "failed": True, "msg": str(exc)}
+    return results
+
+
+def _describe_placement(
+    placement: dict[str, str],
+    hypervisors: list[types.HypervisorConfig],
+) -> dict[str, dict[str, Optional[str]]]:
+    addresses = {hypervisor.name: hypervisor.address for hypervisor in hypervisors}
+    return {name: {"hypervisor": hv, "address": addresses[hv]} for name, hv in placement.items()}
+
+
+def _read_snapshots(
+    hypervisors: list[types.HypervisorConfig],
+    workers: int,
+    module: Optional[_WorkerModule],
+) -> list[dict[str, Any]]:
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        listed = list(pool.map(lambda hv: _list_on_host(hv, module), hypervisors))
+    errors = [error for _snapshot, error in listed if error]
+    if errors:
+        raise types.MultipassCLIError("; ".join(errors))
+    return [snapshot for snapshot, _error in listed]
+
+
+def _place(
+    configs: list[types.VMConfig],
+    hypervisors: list[types.HypervisorConfig],
+    snapshots: list[dict[str, Any]],
+    strategy: str,
+    module: Optional["AnsibleModule"],
+) -> dict[str, str]:
+    loads = [HostLoad(hypervisor, snapshot) for hypervisor, snapshot in zip(hypervisors, snapshots)]
+    existing = {name for load in loads for name in load.instances}
+    placement = plan_placement(configs, loads, strategy)
+    log.get_logger("fleet", module).info(
+        "placement",
+        strategy=strategy,
+        new=lambda: sum(1 for c in configs if c.name not in existing),
+    )
+    return placement
+
+
+def _assign(
+    configs: list[types.VMConfig],
+    placement: dict[str, str],
+    hypervisors: list[types.HypervisorConfig],
+) -> list[tuple[types.HypervisorConfig, list[types.VMConfig]]]:
+    assignments = []
+    for hypervisor in hypervisors:
+        assigned = [config for config in configs if placement[config.name] == hypervisor.name]
+        if assigned:
+            assignments.append((hypervisor, assigned))
+    return assignments
+
+
+def _check_fleet(
+    configs: list[types.VMConfig],
+    placement: dict[str, str],
+    snapshots_by_host: dict[str, dict[str, Any]],
+) -> dict[str, Any]:
+    entries = []
+    failed: dict[str, dict[str, Any]] = {}
+    for config in configs:
+        try:
+            core.check_cloud_init(config)
+        except (types.CloudInitError, FileNotFoundError) as exc:
+            failed[config.name] = {"changed": False, "failed": True, "msg": str(exc)}
+        host = placement[config.name]
+        entry = core.plan_instance(config.name, config, snapshots_by_host[host].get(config.name))
+        entries.append({**entry, "hypervisor": host})
+    return {
+        "changed": any(entry["changed"] for entry in entries),
+        "instances": failed,
+        "failed": list(failed),
+        "warnings": [warning for entry in entries for warning in entry["warnings"]],
+        "plan": entries,
+        "diff": core.render_diff(entries),
+    }
+
+
+def _launch_fleet(
+    assignments: list[tuple[types.HypervisorConfig, list[types.VMConfig]]],
+    workers: int,
+    module: Optional[_WorkerModule],
+    cloud_init_cache_dir: Optional[str],
+) -> dict[str, Any]:
+    results: dict[str, dict[str, Any]] = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_ensure_on_host, hypervisor, host_configs, module, cloud_init_cache_dir)
+            for hypervisor, host_configs in assignments
+        ]
+        for future in futures:
+            results.update(future.result())
+
+    warnings = [warning for result in results.values() for warning in result.get("warnings", [])]
+    return {
+        "changed": any(result["changed"] for result in results.values()),
+        "instances": results,
+        "failed": [name for name, result in results.items() if result.get("failed")],
+        "warnings": warnings,
+    }
+
+
+def ensure_fleet(  # pylint: disable=too-many-arguments
+    configs: list[types.VMConfig],
+    hypervisors: list[types.HypervisorConfig],
+    *,
+    strategy: str = "spread",
+    max_workers: int = 8,
+    check_mode: bool = False,
+    module: "AnsibleModule" = None,
+    cloud_init_cache_dir: Optional[str] = None,
+) -> dict[str, Any]:
+    """
+    Ensures a list of instances is present across several hypervisors.
+
+    One info snapshot is read from every hypervisor in parallel, placement is
+    planned from them, and then each hypervisor launches its share in parallel.
+    Worker threads never call fail_json(): errors are collected and reported
+    from the calling thread.
+
+    Args:
+        configs: The instances to ensure.
+        hypervisors: The hosts to place them on.
+        strategy: A key of STRATEGIES.
+        max_workers: Maximum number of hypervisors worked on at the same time.
+        check_mode: Plan placement and per-instance changes, and validate cloud-init,
+            without running any mutating command.
+        module: Optional AnsibleModule for logging.
+        cloud_init_cache_dir: Optional directory for cached inline cloud-init content.
+
+    Returns:
+        A dictionary with:
+            - changed (bool)
+            - placement (dict) mapping instance name to {"hypervisor": name, "address": address},
+              where address is None for the local daemon
+            - instances (dict) mapping instance name to its ensure_present() result,
+              or to {"failed": True, "msg": ...} if that instance failed; in check mode
+              only failed instances (e.g. invalid cloud-init) are listed
+            - failed (list[str]) names of instances that failed
+            - warnings (list[str]) e.g. size differences left unchanged, in check mode too
+            - plan (list) and diff (dict) in check mode, from the snapshots already read
+
+    Raises:
+        MultipassCLIError: If any hypervisor's snapshot could not be read.
+        PlacementError: If the strategy is unknown or an instance fits on no host.
+    """
+    workers = max(1, min(max_workers, len(hypervisors)))
+    worker_module = _WorkerModule(module) if module else None
+
+    snapshots = _read_snapshots(hypervisors, workers, worker_module)
+    placement = _place(configs, hypervisors, snapshots, strategy, module)
+    if check_mode:
+        by_name = dict(zip((hypervisor.name for hypervisor in hypervisors), snapshots))
+        result = _check_fleet(configs, placement, by_name)
+    else:
+        assignments = _assign(configs, placement, hypervisors)
+        result = _launch_fleet(assignments, workers, worker_module, cloud_init_cache_dir)
+
+    result["placement"] = _describe_placement(placement, hypervisors)
+    return result
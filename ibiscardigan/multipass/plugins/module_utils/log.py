@@ -0,0 +1,125 @@
+"""Levelled, lazy, bounded key/value logging through AnsibleModule.log().
+
+Records look like:
+
+    [cli] level=debug event=result rc=0 stdout="{...}...<48213 chars omitted>...}"
+
+The level comes from the module's `log_level` option, then $MULTIPASS_LOG_LEVEL,
+then "info". Nothing is formatted for records below the level, and field values
+may be callables that are only evaluated when the record is emitted. String
+values longer than the payload limit keep their head and tail.
+"""
+
+import json
+import os
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ansible.module_utils.basic import AnsibleModule
+
+LEVEL_ENV = "MULTIPASS_LOG_LEVEL"
+MAX_PAYLOAD_ENV = "MULTIPASS_LOG_MAX_PAYLOAD"
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40, "off": 100}
+DEFAULT_LEVEL = "info"
+DEFAULT_MAX_PAYLOAD = 2048
+
+
+def log_level_option() -> dict[str, Any]:
+    """Return the `log_level` argument spec entry shared by every module."""
+    return {"type": "str", "choices": list(LEVELS), "required": False}
+
+
+REDACTED = "<redacted>"
+_SECRET_KEYS = ("passphrase", "password", "secret", "token")
+
+
+def truncate(text: str, limit: int) -> str:
+    """Return `text`, keeping only its head and tail if longer than `limit`."""
+    if limit <= 0 or len(text) <= limit:
+        return text
+    half = limit // 2
+    return f"{text[:half]}...<{len(text) - 2 * half} chars omitted>...{text[-half:]}"
+
+
+def redact_args(args: list[str]) -> list[str]:
+    """
+    Returns multipass arguments with secrets and guest commands masked.
+
+    Masks the `authenticate` passphrase, values of `key=value` settings whose key
+    looks secret, and everything after `--` (commands run inside a guest).
+    """
+    redacted: list[str] = []
+    for index, arg in enumerate(args):
+        if arg == "--":
+            if index + 1 < len(args):
+                redacted += ["--", f"<{len(args) - index - 1} args {REDACTED}>"]
+            else:
+                redacted.append(arg)
+            break
+        key, sep, _value = arg.partition("=")
+        if sep and any(secret in key.lower() for secret in _SECRET_KEYS):
+            redacted.append(f"{key}={REDACTED}")
+        elif index > 0 and args[index - 1] == "authenticate":
+            redacted.append(REDACTED)
+        else:
+            redacted.append(arg)
+    return redacted
+
+
+def _format_value(value: Any, limit: int) -> str:
+    if callable(value):
+        value = value()
+    if isinstance(value, (list, tuple)):
+        value = " ".join(str(item) for item in value)
+    text = truncate(str(value), limit)
+    if not text or any(char in text for char in ' ="\n\t'):
+        return json.dumps(text)
+    return text
+
+
+class Logger:
+    """Emits structured records for one component (e.g. "cli", "core")."""
+
+    __slots__ = ("component", "module", "level", "max_payload")
+
+    def __init__(self, component: str, module: "AnsibleModule" = None) -> None:
+        self.component = component
+        self.module = module
+        params = getattr(module, "params", None) or {}
+        level = params.get("log_level") or os.environ.get(LEVEL_ENV) or DEFAULT_LEVEL
+        self.level = LEVELS.get(str(level).lower(), LEVELS[DEFAULT_LEVEL])
+        try:
+            self.max_payload = int(os.environ.get(MAX_PAYLOAD_ENV, DEFAULT_MAX_PAYLOAD))
+        except ValueError:
+            self.max_payload = DEFAULT_MAX_PAYLOAD
+
+    def enabled(self, level: str) -> bool:
+        """Return True if records at `level` would be emitted."""
+        return self.module is not None and LEVELS[level] >= self.level
+
+    def log(self, level: str, event: str, **fields: Any) -> None:
+        """Emit a record if `level` is enabled; values may be zero-argument callables."""
+        if not self.enabled(level):
+            return
+        parts = [f"[{self.component}]", f"level={level}", f"event={event}"]
+        for key, value in fields.items():
+            parts.append(f"{key}={_format_value(value, self.max_payload)}")
+        self.module.log(" ".join(parts))
+
+    def debug(self, event: str, **fields: Any) -> None:
+        self.log("debug", event, **fields)
+
+    def info(self, event: str, **fields: Any) -> None:
+        self.log("info", event, **fields)
+
+    def warning(self, event: str, **fields: Any) -> None:
+        self.log("warning", event, **fields)
+
+    def error(self, event: str, **fields: Any) -> None:
+        self.log("error", event, **fields)
+
+
+def get_logger(component: str, module: Optional["AnsibleModule"] = None) -> Logger:
+    """Return a Logger for `component` that writes to `module`, if given."""
+    return Logger(component, module)
@@ -0,0 +1,152 @@
+"""Diff-based reconciliation of instance mounts."""
+
+import os
+from typing import TYPE_CHECKING, Any, Optional
+
+from . import cli, log, types
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ansible.module_utils.basic import AnsibleModule
+
+
+def mounts_option() -> dict[str, Any]:
+    """Return the `mounts` argument spec entry shared by the hosts and fleet modules."""
+    return {
+        "type": "list",
+        "elements": "dict",
+        "required": False,
+        "options": {
+            "source": {"type": "path", "required": True},
+            "target": {"type": "str", "required": True},
+            "type": {"type": "str", "choices": ["classic", "native"], "default": "classic"},
+        },
+    }
+
+
+def resolve_source(source: str) -> str:
+    """Return the canonical host path for a mount source, with `~` and symlinks resolved."""
+    return os.path.realpath(os.path.expanduser(source))
+
+
+def plan_mounts(
+    wanted: list[types.MountConfig],
+    record: types.InstanceRecord,
+) -> dict[str, Any]:
+    """
+    Compares wanted mounts against those in an instance's info snapshot.
+
+    multipass info reports each mount's source but not its type, so a mount is
+    re-created only when its source differs. A requested native type on a mount
+    that is kept cannot be verified and is reported as a warning. Mounts not in
+    `wanted` are removed; since any of them could be native, removing one from a
+    running instance needs the instance stopped, as does adding a native mount.
+
+    Args:
+        wanted: The desired mounts.
+        record: The instance's record from an info snapshot.
+
+    Returns:
+        A dictionary with:
+            - add (list[MountConfig]) mounts to create
+            - remove (list[str]) targets to unmount
+            - restart (bool) whether the running instance must be stopped for the change
+            - warnings (list[str]) for kept mounts whose requested type cannot be verified
+    """
+    current = record.mounts
+    wanted_by_target = {mount.target: mount for mount in wanted}
+    add: list[types.MountConfig] = []
+    remove: list[str] = [target for target in current if target not in wanted_by_target]
+    warnings: list[str] = []
+
+    for target, mount in wanted_by_target.items():
+        existing = current.get(target)
+        if existing is None:
+            add.append(mount)
+        elif existing["source"] != resolve_source(mount.source):
+            remove.append(target)
+            add.append(mount)
+        elif mount.type == "native":
+            warnings.append(
+                f"Mount '{target}' on VM '{record.name}' was kept; multipass does not report"
+                " mount types, so it may not be native"
+            )
+
+    needs_stop = bool(remove) or any(mount.type == "native" for mount in add)
+    return {
+        "add": add,
+        "remove": remove,
+        "restart": needs_stop and record.state == "Running",
+        "warnings": warnings,
+    }
+
+
+def ensure_mounts(
+    name: str,
+    wanted: list[types.MountConfig],
+    info: dict[str, Any],
+    module: "AnsibleModule" = None,
+    address: Optional[str] = None,
+) -> dict[str, Any]:
+    """
+    Applies the mount changes planned from `info`, in at most one stop/start cycle.
+
+    If the instance was stopped for the change, it is started again even when a
+    mount command fails.
+
+    Args:
+        name: The instance name.
+        wanted: The desired mounts.
+        info: The instance's current info dict.
+        module: Optional AnsibleModule for logging.
+        address: Optional remote daemon address; defaults to the local daemon.
+
+    Returns:
+        A dictionary with:
+            - changed (bool)
+            - added (list[str]) targets mounted
+            - removed (list[str]) targets unmounted
+            - warnings (list[str]) from plan_mounts()
+    """
+    plan = plan_mounts(wanted, types.InstanceRecord(name, info))
+    added = [mount.target for mount in plan["add"]]
+    if not plan["add"] and not plan["remove"]:
+        return {"changed": False, "added": [], "removed": [], "warnings": plan["warnings"]}
+
+    logger = log.get_logger("mounts", module)
+    logger.info(
+        "reconcile",
+        name=name,
+        add=added,
+        remove=plan["remove"],
+        restart=plan["restart"],
+    )
+
+    if plan["restart"]:
+        cli.run_multipass_command(["stop", name], module=module, address=address)
+
+    try:
+        for target in plan["remove"]:
+            cli.run_multipass_command(
+                ["umount", f"{name}:{target}"],
+                module=module,
+                address=address,
+            )
+        for mount in plan["add"]:
+            cmd = ["mount"]
+            if mount.type == "native":
+                cmd += ["--type", "native"]
+            cli.run_multipass_command(
+                cmd + [resolve_source(mount.source), f"{name}:{mount.target}"],
+                module=module,
+                address=address,
+            )
+    finally:
+        if plan["restart"]:
+            cli.run_multipass_command(["start", name], module=module, address=address)
+
+    return {
+        "changed": True,
+        "added": added,
+        "removed": plan["remove"],
+        "warnings": plan["warnings"],
+    }
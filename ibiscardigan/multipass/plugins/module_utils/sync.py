@@ -0,0 +1,210 @@
+"""Content-hash based file sync into multipass instances."""
+
+import hashlib
+import os
+import tarfile
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, TYPE_CHECKING, Any
+
+from . import cli, log, types
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ansible.module_utils.basic import AnsibleModule
+
+_CHUNK_SIZE = 1024 * 1024
+
+# Prints "<sha256>  ./<path>" for every file under $1, or nothing if $1 is missing.
+# $1 is double-quoted, so a leading "~" in the destination is not expanded.
+_REMOTE_HASH_SCRIPT = '[ -d "$1" ] || exit 0; cd "$1" && find . -type f -exec sha256sum {} +'
+_REMOTE_EXTRACT_SCRIPT = 'mkdir -p "$1" && tar -xf - -C "$1"'
+
+
+def hash_tree(src: str) -> dict[str, tuple[str, int]]:
+    """
+    Hashes every regular file below a local directory.
+
+    Args:
+        src: The local directory to hash.
+
+    Returns:
+        A dictionary mapping POSIX-style relative paths to (sha256, size).
+    """
+    hashes: dict[str, tuple[str, int]] = {}
+    for root, _dirs, files in os.walk(src):
+        for filename in files:
+            path = os.path.join(root, filename)
+            if not os.path.isfile(path):
+                continue
+            digest = hashlib.sha256()
+            with open(path, "rb") as handle:
+                while chunk := handle.read(_CHUNK_SIZE):
+                    digest.update(chunk)
+            rel = os.path.relpath(path, src).replace(os.sep, "/")
+            hashes[rel] = (digest.hexdigest(), os.path.getsize(path))
+    return hashes
+
+
+def remote_hashes(name: str, dest: str, module: "AnsibleModule" = None) -> dict[str, str]:
+    """
+    Fetches the sha256 of every file below `dest` inside an instance in one exec call.
+
+    Args:
+        name: The instance name.
+        dest: The directory inside the instance.
+        module: Optional AnsibleModule for logging.
+
+    Returns:
+        A dictionary mapping POSIX-style relative paths to sha256 hex digests.
+    """
+    result = cli.run_multipass_command(
+        ["exec", name, "--", "sh", "-c", _REMOTE_HASH_SCRIPT, "sh", dest],
+        module=module,
+    )
+    hashes: dict[str, str] = {}
+    for line in str(result.get("stdout", "")).splitlines():
+        # sha256sum escapes unusual file names with a leading backslash; those are
+        # left out so the file is simply re-sent.
+        if len(line) < 67 or line.startswith("\\"):
+            continue
+        path = line[66:]
+        hashes[path[2:] if path.startswith("./") else path] = line[:64]
+    return hashes
+
+
+def build_archive(src: str, paths: list[str], fileobj: IO[bytes]) -> None:
+    """
+    Streams an uncompressed tar archive of the given files into a file object.
+
+    Files are copied in chunks, so memory use does not grow with the tree size.
+
+    Args:
+        src: The local directory the paths are relative to.
+        paths: POSIX-style relative paths to include.
+        fileobj: A writable binary file object, e.g. a temporary file.
+    """
+    with tarfile.open(fileobj=fileobj, mode="w|") as tar:
+        for rel in paths:
+            path = os.path.join(src, *rel.split("/"))
+            stat = os.stat(path)
+            info = tarfile.TarInfo(rel)
+            info.size = stat.st_size
+            info.mode = stat.st_mode & 0o7777
+            info.mtime = int(stat.st_mtime)
+            with open(path, "rb") as handle:
+                tar.addfile(info, handle)
+
+
+def sync_instance(  # pylint: disable=too-many-arguments
+    name: str,
+    src: str,
+    dest: str,
+    local: dict[str, tuple[str, int]],
+    *,
+    check_mode: bool = False,
+    module: "AnsibleModule" = None,
+) -> dict[str, Any]:
+    """
+    Syncs a pre-hashed local tree into one instance, sending only changed files.
+
+    Args:
+        name: The instance name.
+        src: The local source directory.
+        dest: The destination directory inside the instance. A leading `~` is not expanded.
+        local: The result of hash_tree(src).
+        check_mode: Report what would be sent without transferring anything.
+        module: Optional AnsibleModule for logging.
+
+    Returns:
+        A dictionary with:
+            - changed (bool)
+            - files_sent / files_skipped (int)
+            - bytes_sent / bytes_skipped (int)
+    """
+    remote = remote_hashes(name, dest, module=module)
+    changed = sorted(rel for rel, (digest, _size) in local.items() if remote.get(rel) != digest)
+    bytes_sent = sum(local[rel][1] for rel in changed)
+    bytes_total = sum(size for _digest, size in local.values())
+
+    log.get_logger("sync", module).info("diff", name=name, changed=len(changed), total=len(local))
+
+    if changed and not check_mode:
+        with tempfile.TemporaryFile() as archive:
+            build_archive(src, changed, archive)
+            archive.seek(0)
+            cli.run_multipass_command(
+                ["exec", name, "--", "sh", "-c", _REMOTE_EXTRACT_SCRIPT, "sh", dest],
+                module=module,
+                stdin=archive,
+            )
+
+    return {
+        "changed": bool(changed),
+        "files_sent": len(changed),
+        "files_skipped": len(local) - len(changed),
+        "bytes_sent": bytes_sent,
+        "bytes_skipped": bytes_total - bytes_sent,
+    }
+
+
+def sync_instances(  # pylint: disable=too-many-arguments
+    names: list[str],
+    src: str,
+    dest: str,
+    *,
+    max_workers: int = 8,
+    check_mode: bool = False,
+    module: "AnsibleModule" = None,
+) -> dict[str, Any]:
+    """
+    Syncs a local directory into several instances concurrently.
+
+    The source tree is hashed once and shared by every instance. A failure on
+    one instance is recorded in its result and does not stop the others.
+
+    Args:
+        names: The instance names.
+        src: The local source directory.
+        dest: The destination directory inside each instance. A leading `~` is not expanded.
+        max_workers: Maximum number of instances synced at the same time.
+        check_mode: Report what would be sent without transferring anything.
+        module: Optional AnsibleModule for logging.
+
+    Returns:
+        A dictionary with:
+            - changed (bool)
+            - instances (dict) mapping each name to its sync_instance() result,
+              or to {"failed": True, "msg": ...} if that instance failed
+            - failed (list[str]) names of instances that failed
+            - bytes_sent / bytes_skipped (int) totals across successful instances
+    """
+    local = hash_tree(src)
+    workers = max(1, min(max_workers, len(names)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            name: pool.submit(
+                sync_instance,
+                name,
+                src,
+                dest,
+                local,
+                check_mode=check_mode,
+                module=module,
+            )
+            for name in names
+        }
+        results: dict[str, dict[str, Any]] = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except (types.MultipassCLIError, OSError) as exc:
+                results[name] = {"changed": False, "failed": True, "msg": str(exc)}
+
+    synced = [result for result in results.values() if not result.get("failed")]
+    return {
+        "changed": any(result["changed"] for result in synced),
+        "instances": results,
+        "failed": [name for name, result in results.items() if result.get("failed")],
+        "bytes_sent": sum(result["bytes_sent"] for result in synced),
+        "bytes_skipped": sum(result["bytes_skipped"] for result in synced),
+    }
@@ -6,22 +6,48 @@ the CLI wrapper, orchestration logic, and the Ansible integration layer.
 
 Classes:
     - MultipassCLIError: Exception raised when a Multipass CLI command fails.
+    - CloudInitError: Exception raised when cloud-init user data fails validation.
+    - PlacementError: Exception raised when instances cannot be placed on any hypervisor.
+    - MountConfig: Dataclass describing a host directory mounted into an instance.
     - VMConfig: Dataclass describing the configuration of a Multipass instance.
+    - HypervisorConfig: Dataclass describing a host running a multipass daemon.
+    - InstanceRecord: Compact, slotted view of one instance from an info snapshot.
+    - InstanceIndex: Name, IPv4 and state lookups over a set of InstanceRecords.
 
 This module is intentionally free of any execution logic and exists to
 improve structure, clarity, and testability of the overall codebase.
 """
 
+import sys
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Iterable, Iterator, Optional
 
 
 class MultipassCLIError(Exception):
     """Raised when the multipass command fails."""
 
 
+class CloudInitError(Exception):
+    """Raised when cloud-init user data is malformed."""
+
+
+class PlacementError(Exception):
+    """Raised when an instance cannot be placed on any hypervisor."""
+
+
 @dataclass
-class VMConfig:
+class MountConfig:
+    """A host directory mounted into a Multipass instance."""
+
+    source: str
+    target: str
+    # "classic" (sshfs) or "native" (hypervisor share; the instance must be stopped).
+    # Only applied when the mount is created: multipass does not report it back.
+    type: str = "classic"
+
+
+@dataclass
+class VMConfig:  # pylint: disable=too-many-instance-attributes
     """Configuration for a Multipass instance."""
 
     name: str
@@ -29,5 +55,154 @@ class VMConfig:
     cpus: Optional[int] = None
     memory: Optional[str] = None
     disk: Optional[str] = None
-    cloud_init: Optional[str] = None
+    cloud_init: Optional[str] = None  # A file path, or inline #cloud-config content
     network: Optional[str] = None
+    mounts: Optional[list[MountConfig]] = None  # None leaves mounts unmanaged
+
+    def __post_init__(self) -> None:
+        # Modules pass mounts as option dicts.
+        if self.mounts is not None:
+            self.mounts = [_mount_config(mount) for mount in self.mounts]
+
+
+def _mount_config(mount: Any) -> MountConfig:
+    """Return `mount` as a MountConfig, building it from a dict if needed."""
+    return mount if isinstance(mount, MountConfig) else MountConfig(**mount)
+
+
+@dataclass
+class HypervisorConfig:
+    """A host running a multipass daemon that instances can be placed on."""
+
+    name: str
+    address: Optional[str] = None  # host:port of a remote daemon; None for the local one
+    cpus: Optional[int] = None  # Capacity available to instances; None means unlimited
+    memory: Optional[str] = None
+
+
+def _to_int(value: Any) -> Optional[int]:
+    """Convert a multipass numeric field (often a string) to int, or None."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _intern(value: Any) -> Optional[str]:
+    """Intern a string field repeated across instances (state, release, image hash)."""
+    return sys.intern(value) if isinstance(value, str) else None
+
+
+class InstanceRecord:  # pylint: disable=too-many-instance-attributes
+    """
+    Compact view of one instance from a `multipass info` snapshot.
+
+    Only the fields this collection reads are kept, already normalised: the
+    scalars, memory and largest disk size in bytes, and the mounts. The info
+    dict is not retained, so it can be freed once records are built.
+    """
+
+    # Public fields, in the order to_dict() returns them.
+    FIELDS = (
+        "state",
+        "ipv4",
+        "release",
+        "image_hash",
+        "cpu_count",
+        "memory_total",
+        "disk_total",
+        "mounts",
+    )
+
+    __slots__ = (
+        "name",
+        "state",
+        "ipv4",
+        "release",
+        "image_hash",
+        "cpu_count",
+        "memory_total",
+        "disk_total",
+        "_mounts",
+    )
+
+    def __init__(self, name: str, info: dict[str, Any]) -> None:
+        self.name = name
+        self.state = _intern(info.get("state"))
+        self.ipv4: tuple[str, ...] = tuple(info.get("ipv4") or ())
+        self.release = _intern(info.get("release"))
+        self.image_hash = _intern(info.get("image_hash"))
+        self.cpu_count = _to_int(info.get("cpu_count"))
+        self.memory_total = _to_int((info.get("memory") or {}).get("total"))
+        disk_totals = (_to_int(disk.get("total")) for disk in (info.get("disks") or {}).values())
+        self.disk_total = max((total for total in disk_totals if total is not None), default=None)
+        mounts = info.get("mounts") or {}
+        self._mounts = tuple((target, mount.get("source_path")) for target, mount in mounts.items())
+
+    @property
+    def mounts(self) -> dict[str, dict[str, Any]]:
+        """Mounts keyed by target path, each with its host `source` (multipass omits the type)."""
+        return {target: {"source": source} for target, source in self._mounts}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return one of FIELDS by name, or `default` if it is unknown or not reported."""
+        if key not in self.FIELDS:
+            return default
+        value = getattr(self, key)
+        if key == "ipv4":
+            value = list(value)
+        return default if value is None else value
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return FIELDS as a dict, leaving out fields multipass did not report."""
+        info = {key: self.get(key) for key in self.FIELDS}
+        return {key: value for key, value in info.items() if value is not None}
+
+
+class InstanceIndex:
+    """Constant-time lookups by name, IPv4 and state over one snapshot."""
+
+    __slots__ = ("_by_name", "_by_ip", "_by_state")
+
+    def __init__(self, records: Iterable[InstanceRecord]) -> None:
+        self._by_name: dict[str, InstanceRecord] = {}
+        self._by_ip: dict[str, InstanceRecord] = {}
+        self._by_state: dict[str, list[InstanceRecord]] = {}
+        for record in records:
+            self._by_name[record.name] = record
+            for ip in record.ipv4:
+                self._by_ip.setdefault(ip, record)
+            self._by_state.setdefault(record.state or "", []).append(record)
+
+    @classmethod
+    def from_snapshot(cls, instances: dict[str, dict[str, Any]]) -> "InstanceIndex":
+        """Build an index from a list_instances() result."""
+        return cls(InstanceRecord(name, info) for name, info in instances.items())
+
+    def get(self, name: str) -> Optional[InstanceRecord]:
+        """Return the record for an instance name, or None."""
+        return self._by_name.get(name)
+
+    def by_ip(self, ip: str) -> Optional[InstanceRecord]:
+        """Return the record owning an IPv4 address, or None."""
+        return self._by_ip.get(ip)
+
+    def by_state(self, state: str) -> list[InstanceRecord]:
+        """Return all records in the given state (e.g. "Running")."""
+        return list(self._by_state.get(state, ()))
+
+    def names(self) -> list[str]:
+        """Return all instance names."""
+        return list(self._by_name)
+
+    def __getitem__(self, name: str) -> InstanceRecord:
+        return self._by_name[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._by_name
+
+    def __iter__(self) -> Iterator[InstanceRecord]:
+        return iter(self._by_name.values())
+
+    def __len__(self) -> int:
+        return len(self._by_name)
@@ -0,0 +1,85 @@
+"""Ansible module for placing Multipass VMs across several hypervisors.
+
+Each hypervisor is a host running multipass, reached through the client's
+MULTIPASS_SERVER_ADDRESS (leave `address` unset for the local daemon). New
+instances are placed with a `spread`, `pack` or `least_loaded` strategy;
+existing ones stay where they are. The returned `placement` maps every
+instance to its hypervisor's `name` and `address`. In check mode the
+per-instance `plan` is computed from the snapshots already read, so no mutating
+command runs; cloud-init is still validated and size drift is still warned about.
+"""
+
+from ansible.module_utils.basic import AnsibleModule, missing_required_lib
+from ansible_collections.ibiscardigan.multipass.plugins.module_utils import (  # pylint: disable=import-error
+    cloud_init,
+    fleet,
+    log,
+    mounts,
+    types,
+)
+
+
+def main():
+    """Ansible entry point for placing a fleet of multipass hosts."""
+    argument_spec = {
+        "hypervisors": {
+            "type": "list",
+            "elements": "dict",
+            "required": True,
+            "options": {
+                "name": {"type": "str", "required": True},
+                "address": {"type": "str", "required": False},
+                "cpus": {"type": "int", "required": False},
+                "memory": {"type": "str", "required": False},
+            },
+        },
+        "instances": {
+            "type": "list",
+            "elements": "dict",
+            "required": True,
+            "options": {
+                "name": {"type": "str", "required": True},
+                "image": {"type": "str", "required": True},
+                "cpus": {"type": "int", "required": False},
+                "memory": {"type": "str", "required": False},
+                "disk": {"type": "str", "required": False},
+                "cloud_init": {"type": "str", "required": False},
+                "network": {"type": "str", "required": False},
+                "mounts": mounts.mounts_option(),
+            },
+        },
+        "strategy": {"type": "str", "choices": sorted(fleet.STRATEGIES), "default": "spread"},
+        "max_workers": {"type": "int", "default": 8},
+        "cloud_init_cache_dir": {"type": "path", "required": False},
+        "log_level": log.log_level_option(),
+    }
+
+    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
+
+    if any(instance.get("cloud_init") for instance in module.params["instances"]) and not cloud_init.HAS_YAML:
+        module.fail_json(msg=missing_required_lib("PyYAML"), exception=cloud_init.YAML_IMPORT_ERROR)
+
+    hypervisors = [types.HypervisorConfig(**hypervisor) for hypervisor in module.params["hypervisors"]]
+    configs = [types.VMConfig(**instance) for instance in module.params["instances"]]
+
+    try:
+        result = fleet.ensure_fleet(
+            configs,
+            hypervisors,
+            strategy=module.params["strategy"],
+            max_workers=module.params["max_workers"],
+            check_mode=module.check_mode,
+            module=module,
+            cloud_init_cache_dir=module.params.get("cloud_init_cache_dir"),
+        )
+        if not module._diff:  # pylint: disable=protected-access
+            result.pop("diff", None)
+        if result["failed"]:
+            module.fail_json(msg=f"Failed to ensure instances: {', '.join(result['failed'])}", **result)
+        module.exit_json(**result)
+    except (types.MultipassCLIError, types.PlacementError) as exc:
+        module.fail_json(msg=f"Failed to place fleet: {exc}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,30 @@
 """Ansible module for managing Multipass VMs.
 
-Supports creating and removing VMs using the multipass CLI.
+Supports creating and removing VMs using the multipass CLI. `cloud_init`
+accepts either a file path or inline (e.g. templated) user data such as
+`#cloud-config` content. Inline content is cached in `cloud_init_cache_dir`
+(or $MULTIPASS_CLOUD_INIT_CACHE), which is created if missing.
+When `mounts` is given, only missing mounts or mounts whose source changed are
+added, and mounts not listed are removed. multipass does not report mount types,
+so a mount's `type` is only applied when it is created; a kept mount requested
+as native returns a warning. Adding a native mount or removing any mount from a
+running VM stops it, once for all of its mount changes. Existing VMs are not
+resized; if their cpus, memory or disk differ, a warning is returned.
+
+Check mode plans the change from one read-only `multipass info` call and
+reports it as `plan` (and as a diff with --diff) without launching or deleting.
+A real run returns the same `plan`, and its diff, from the info it reads
+before changing anything.
 """
 
-from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.ibiscardigan.multipass.plugins.module_utils import core, types  # pylint: disable=import-error
+from ansible.module_utils.basic import AnsibleModule, missing_required_lib
+from ansible_collections.ibiscardigan.multipass.plugins.module_utils import (  # pylint: disable=import-error
+    cloud_init,
+    core,
+    log,
+    mounts,
+    types,
+)
 
 
 def main():
@@ -16,21 +36,26 @@ def main():
         "memory": {"type": "str", "required": False},
         "disk": {"type": "str", "required": False},
         "cloud_init": {"type": "str", "required": False},
+        "cloud_init_cache_dir": {"type": "path", "required": False},
         "network": {"type": "str", "required": False},
+        "mounts": mounts.mounts_option(),
         "state": {
             "type": "str",
             "choices": ["present", "absent"],
             "default": "present",
         },
+        "log_level": log.log_level_option(),
     }
 
-    module = AnsibleModule(argument_spec=argument_spec)
+    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
 
     name = module.params["name"]
     state = module.params["state"]
 
     if state == "present" and not module.params.get("image"):
         module.fail_json(msg="'image' is required when state=present")
+    if module.params.get("cloud_init") and not cloud_init.HAS_YAML:
+        module.fail_json(msg=missing_required_lib("PyYAML"), exception=cloud_init.YAML_IMPORT_ERROR)
 
     config = types.VMConfig(
         name=name,
@@ -40,13 +65,28 @@ def main():
         disk=module.params.get("disk"),
         cloud_init=module.params.get("cloud_init"),
         network=module.params.get("network"),
+        mounts=module.params.get("mounts"),
     )
 
+    desired = config if state == "present" else None
+
     try:
+        if module.check_mode:
+            result = core.check(name, desired, module=module)
+            if not module._diff:  # pylint: disable=protected-access
+                result.pop("diff")
+            module.exit_json(**result)
+
         if state == "present":
-            result = core.ensure_present(config, module=module)
+            result = core.ensure_present(
+                config,
+                module=module,
+                cloud_init_cache_dir=module.params.get("cloud_init_cache_dir"),
+            )
         else:
             result = core.ensure_absent(name, module=module)
+        if module._diff and result["changed"]:  # pylint: disable=protected-access
+            result["diff"] = core.render_diff(result["plan"])
         module.exit_json(**result)
     except types.MultipassCLIError as exc:
         module.fail_json(msg=f"Unexpected error: {exc}")
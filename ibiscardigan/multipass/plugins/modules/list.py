@@ -1,13 +1,19 @@
 """Ansible module for listing Multipass instances."""
 
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.ibiscardigan.multipass.plugins.module_utils import core, types  # pylint: disable=import-error
+from ansible_collections.ibiscardigan.multipass.plugins.module_utils import (  # pylint: disable=import-error
+    core,
+    log,
+    types,
+)
 
 
 def main():
     """Entrypoint for Ansible list module."""
     module = AnsibleModule(
-        argument_spec={},  # No args needed for listing
+        argument_spec={
+            "log_level": log.log_level_option(),
+        },
         supports_check_mode=True,
     )
 
@@ -0,0 +1,52 @@
+"""Ansible module for syncing a local directory into Multipass VMs.
+
+Only files whose sha256 differs inside the instance are sent, as one tar
+archive streamed over `multipass exec`.
+"""
+
+import os
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.ibiscardigan.multipass.plugins.module_utils import (  # pylint: disable=import-error
+    log,
+    sync,
+    types,
+)
+
+
+def main():
+    """Ansible entry point for syncing files into multipass hosts."""
+    argument_spec = {
+        "names": {"type": "list", "elements": "str", "required": True},
+        "src": {"type": "path", "required": True},
+        "dest": {"type": "str", "required": True},
+        "max_workers": {"type": "int", "default": 8},
+        "log_level": log.log_level_option(),
+    }
+
+    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
+
+    src = module.params["src"]
+    if not os.path.isdir(src):
+        module.fail_json(msg=f"Source directory not found: {src}")
+    if module.params["dest"].startswith("~"):
+        module.fail_json(msg="'dest' is not shell-expanded; use an absolute path such as /home/ubuntu/conf")
+
+    try:
+        result = sync.sync_instances(
+            module.params["names"],
+            src,
+            module.params["dest"],
+            max_workers=module.params["max_workers"],
+            check_mode=module.check_mode,
+            module=module,
+        )
+        if result["failed"]:
+            module.fail_json(msg=f"Failed to sync files into: {', '.join(result['failed'])}", **result)
+        module.exit_json(**result)
+    except types.MultipassCLIError as exc:
+        module.fail_json(msg=f"Failed to sync files: {exc}")
+
+
+if __name__ == "__main__":
+    main()
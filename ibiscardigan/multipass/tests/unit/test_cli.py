@@ -1,8 +1,9 @@
 """Tests for the multipass CLI wrapper."""
 
+import io
 import subprocess
 import pytest
-from plugins.module_utils import cli, types
+from plugins.module_utils import cli, log, types
 
 
 def test_run_command_success(monkeypatch):
@@ -141,13 +142,15 @@ def test_run_command_nonzero_with_logging(monkeypatch):
     with pytest.raises(types.MultipassCLIError):
         cli.run_multipass_command(["fail"], module=MockModule())
 
-    assert any("Exit code: 2" in log for log in logs)
-    assert any("stdout" in log for log in logs)
-    assert any("stderr" in log for log in logs)
+    assert any("event=command_failed" in log and "rc=2" in log for log in logs)
+    assert any("stdout=partial" in log for log in logs)
+    assert any("stderr=error" in log for log in logs)
 
 
 def test_run_command_success_with_logging(monkeypatch):
-    """Test successful command logs output and return code."""
+    """Test successful command logs output and return code at debug level."""
+
+    monkeypatch.setenv(log.LEVEL_ENV, "debug")
 
     logs = []
 
@@ -168,5 +171,76 @@ def test_run_command_success_with_logging(monkeypatch):
     monkeypatch.setattr(subprocess, "run", lambda *_args, **_kwargs: Result())
     result = cli.run_multipass_command(["ok"], module=MockModule())
     assert result["rc"] == 0
-    assert any("Executing" in log for log in logs)
-    assert any("Command returned code 0" in log for log in logs)
+    assert any("event=exec" in log and "args=ok" in log for log in logs)
+    assert any("event=result" in log and "rc=0" in log for log in logs)
+
+
+def test_run_command_with_stdin(monkeypatch):
+    """Test that a stdin file object is passed through to the subprocess."""
+
+    captured = {}
+
+    class Result:
+        """Mock result."""
+
+        returncode = 0
+        stdout = "done\n"
+        stderr = ""
+
+    def mock_run(*_args, **kwargs):
+        captured.update(kwargs)
+        return Result()
+
+    monkeypatch.setattr(subprocess, "run", mock_run)
+    payload = io.BytesIO(b"payload")
+    result = cli.run_multipass_command(["exec", "vm1", "--", "cat"], stdin=payload)
+    assert captured["stdin"] is payload
+    assert result["stdout"] == "done"
+
+
+def test_run_command_default_level_skips_debug(monkeypatch):
+    """Test that successful commands log nothing at the default level."""
+
+    logs = []
+
+    class MockModule:
+        """Mock AnsibleModule capturing logs."""
+
+        params = {}
+
+        def log(self, msg):
+            """Append a message to the logs."""
+            logs.append(msg)
+
+    class Result:
+        """Mock success result with a large payload."""
+
+        returncode = 0
+        stdout = "x" * 100000
+        stderr = ""
+
+    monkeypatch.delenv(log.LEVEL_ENV, raising=False)
+    monkeypatch.setattr(subprocess, "run", lambda *_args, **_kwargs: Result())
+    cli.run_multipass_command(["info"], module=MockModule())
+    assert not logs
+
+
+def test_run_command_with_address(monkeypatch):
+    """Test that a remote address is passed to the client via the environment."""
+
+    captured = {}
+
+    class Result:
+        """Mock success result."""
+
+        returncode = 0
+        stdout = ""
+        stderr = ""
+
+    def mock_run(*_args, **kwargs):
+        captured.update(kwargs)
+        return Result()
+
+    monkeypatch.setattr(subprocess, "run", mock_run)
+    cli.run_multipass_command(["list"], address="10.0.0.2:50051")
+    assert captured["env"]["MULTIPASS_SERVER_ADDRESS"] == "10.0.0.2:50051"
@@ -0,0 +1,95 @@
+"""Unit tests for cloud-init validation and caching."""
+
+import os
+
+import pytest
+from plugins.module_utils import cloud_init, types
+
+VALID = "#cloud-config\npackages:\n  - nginx\n"
+
+
+def test_prepare_inline_writes_content_addressed_file(tmp_path):
+    """Inline content is cached once under its sha256."""
+    path, digest = cloud_init.prepare(VALID, cache_dir=str(tmp_path))
+    assert path == os.path.join(str(tmp_path), f"{digest}.yaml")
+    with open(path, encoding="utf-8") as handle:
+        assert handle.read() == VALID
+
+    again, again_digest = cloud_init.prepare(VALID, cache_dir=str(tmp_path))
+    assert (again, again_digest) == (path, digest)
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_prepare_cache_dir_from_env(monkeypatch, tmp_path):
+    """The cache directory falls back to the environment variable."""
+    monkeypatch.setenv(cloud_init.CACHE_DIR_ENV, str(tmp_path / "cache"))
+    path, _digest = cloud_init.prepare(VALID)
+    assert path.startswith(str(tmp_path / "cache"))
+
+
+def test_prepare_file_path_is_passed_through(tmp_path):
+    """A file path is validated and returned unchanged."""
+    source = tmp_path / "user-data.yaml"
+    source.write_text(VALID)
+    path, digest = cloud_init.prepare(str(source), cache_dir=str(tmp_path / "cache"))
+    assert path == str(source)
+    assert digest == cloud_init.content_hash(VALID)
+    assert not (tmp_path / "cache").exists()
+
+
+def test_prepare_inline_needs_cache_dir(monkeypatch, tmp_path):
+    """Inline content is not written anywhere unless a cache directory is configured."""
+    monkeypatch.delenv(cloud_init.CACHE_DIR_ENV, raising=False)
+    monkeypatch.setenv("HOME", str(tmp_path))
+    with pytest.raises(types.CloudInitError, match="cloud_init_cache_dir"):
+        cloud_init.prepare(VALID)
+    assert not os.listdir(tmp_path)
+
+
+def test_validate_requires_yaml_for_cloud_config(monkeypatch):
+    """Without PyYAML, #cloud-config content fails instead of skipping validation."""
+    monkeypatch.setattr(cloud_init, "HAS_YAML", False)
+    with pytest.raises(ImportError, match="PyYAML"):
+        cloud_init.validate(VALID)
+    assert cloud_init.validate("#!/bin/sh\necho hi\n") == {}
+
+
+def test_prepare_missing_file():
+    """A missing path raises FileNotFoundError."""
+    with pytest.raises(FileNotFoundError):
+        cloud_init.prepare("/nonexistent/user-data.yaml")
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "#cloud-config\npackages: [nginx\n",
+        "#cloud-config\n- just\n- a list\n",
+    ],
+)
+def test_validate_rejects_malformed(content):
+    """Bad YAML and non-mappings in cloud-config content are rejected."""
+    with pytest.raises(types.CloudInitError):
+        cloud_init.validate(content)
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "#!/bin/bash\napt-get install -y nginx\n",
+        "## template: jinja\n#cloud-config\nhostname: {{ v1.local_hostname }}\n",
+        "#include\nhttps://example.com/user-data\n",
+        'Content-Type: multipart/mixed; boundary="==BOUNDARY=="\nMIME-Version: 1.0\n',
+    ],
+)
+def test_validate_passes_other_formats_through(content):
+    """User data that is not #cloud-config is not parsed as YAML."""
+    assert cloud_init.validate(content) == {}
+
+
+def test_prepare_caches_shell_script(tmp_path):
+    """Inline scripts are cached unchanged like cloud-config content."""
+    script = "#!/bin/bash\necho hello\n"
+    path, _digest = cloud_init.prepare(script, cache_dir=str(tmp_path))
+    with open(path, encoding="utf-8") as handle:
+        assert handle.read() == script
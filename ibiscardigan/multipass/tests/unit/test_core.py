@@ -116,3 +116,252 @@ def test_list_instances_command_fails(monkeypatch):
     monkeypatch.setattr(cli, "run_multipass_command", helpers.raise_cli_error)
     with pytest.raises(types.MultipassCLIError):
         core.list_instances()
+
+
+def test_get_index_is_memoized(monkeypatch):
+    """get_index() queries multipass once until a refresh is requested."""
+    calls = []
+
+    def mock_list_instances(**_kwargs):
+        calls.append(True)
+        return {"vm1": {"state": "Running"}}
+
+    monkeypatch.setattr(core, "_SNAPSHOT", {})
+    monkeypatch.setattr(core, "list_instances", mock_list_instances)
+    assert core.get_index().names() == ["vm1"]
+    core.get_index()
+    assert len(calls) == 1
+    core.get_index(refresh=True)
+    assert len(calls) == 2
+
+
+def test_select_instances_glob_and_attr():
+    """select_instances() matches names by glob and flattens list attributes."""
+    index = types.InstanceIndex.from_snapshot(
+        {
+            "web-2": {"state": "Running", "ipv4": ["10.0.0.2"]},
+            "web-1": {"state": "Running", "ipv4": ["10.0.0.1", "172.17.0.1"]},
+            "db-1": {"state": "Stopped", "ipv4": []},
+        }
+    )
+    assert core.select_instances(index, "web-*", attr="ipv4") == ["10.0.0.1", "172.17.0.1", "10.0.0.2"]
+    assert core.select_instances(index, "db-*", attr="state") == ["Stopped"]
+    assert core.select_instances(index, "*", attr="name") == ["db-1", "web-1", "web-2"]
+    assert core.select_instances(index, "db-1") == [{"name": "db-1", "state": "Stopped", "ipv4": [], "mounts": {}}]
+    assert not core.select_instances(index, "db-1", attr="cpu_count")
+    assert not core.select_instances(index, "cache-*")
+
+
+def test_select_instances_exact_name_uses_index():
+    """A pattern without glob characters does not scan the other records."""
+
+    class Index:
+        """Index stand-in that fails if asked for every name."""
+
+        def get(self, name):
+            return types.InstanceRecord(name, {"state": "Running"}) if name == "vm1" else None
+
+        def names(self):
+            raise AssertionError("exact names must not scan the index")
+
+    assert core.select_instances(Index(), "vm1", attr="state") == ["Running"]
+    assert not core.select_instances(Index(), "vm2")
+
+
+def test_get_index_reuses_snapshot(monkeypatch):
+    """get_index() builds one index per snapshot and rebuilds after refresh."""
+    monkeypatch.setattr(core, "_SNAPSHOT", {})
+    monkeypatch.setattr(core, "list_instances", lambda **_kw: {"vm1": {"state": "Running", "ipv4": ["10.0.0.9"]}})
+    index = core.get_index()
+    assert index.by_ip("10.0.0.9").name == "vm1"
+    assert core.get_index() is index
+    assert core.get_index(refresh=True) is not index
+
+
+def test_ensure_present_rejects_bad_cloud_init_before_launch(monkeypatch):
+    """ensure_present() fails on malformed cloud-init without calling multipass."""
+    dummy = helpers.DummyModule()
+    monkeypatch.setattr(cli, "run_multipass_command", helpers.raise_cli_error)
+    config = types.VMConfig(name="vm1", image="20.04", cloud_init="#cloud-config\n- not a mapping\n")
+    with pytest.raises(RuntimeError):
+        core.ensure_present(config, module=dummy)
+    assert "mapping" in dummy.fail_msg
+
+
+def test_ensure_present_launches_with_cached_cloud_init(monkeypatch, tmp_path):
+    """ensure_present() passes the cached file to launch and reports its hash."""
+    launched = []
+
+    def mock_run(args, **_kwargs):
+        launched.append(args)
+        return {"rc": 0}
+
+    monkeypatch.setattr(core, "get_info", helpers.generate_toggle_mock_get_info())
+    monkeypatch.setattr(cli, "run_multipass_command", mock_run)
+    config = types.VMConfig(name="vm1", image="20.04", cloud_init="#cloud-config\npackages: [nginx]\n")
+    result = core.ensure_present(config, cloud_init_cache_dir=str(tmp_path))
+
+    cached = launched[0][launched[0].index("--cloud-init") + 1]
+    assert cached == str(tmp_path / f"{result['cloud_init_hash']}.yaml")
+
+
+@pytest.mark.parametrize(
+    "size, expected",
+    [("512M", 512 * 1024**2), ("1.5G", int(1.5 * 1024**3)), ("10GiB", 10 * 1024**3), ("2048", 2048), (None, None)],
+)
+def test_parse_size(size, expected):
+    """parse_size() understands multipass size strings."""
+    assert core.parse_size(size) == expected
+
+
+def test_parse_size_rejects_garbage():
+    """parse_size() raises MultipassCLIError so modules report it through fail_json."""
+    with pytest.raises(types.MultipassCLIError, match="Invalid size"):
+        core.parse_size("lots")
+
+
+def test_get_index_is_keyed_by_address(monkeypatch):
+    """get_index() memoizes each daemon address separately."""
+    monkeypatch.setattr(core, "_SNAPSHOT", {})
+    monkeypatch.setattr(core, "list_instances", lambda address=None, **_kw: {f"vm-{address}": {}})
+    assert core.get_index().names() == ["vm-None"]
+    assert core.get_index(address="hv2:50051").names() == ["vm-hv2:50051"]
+
+
+def test_ensure_present_reconciles_mounts_on_existing_vm(monkeypatch):
+    """ensure_present() adds missing mounts to an existing VM and reports them."""
+    commands = []
+
+    def mock_run(args, **_kwargs):
+        commands.append(args)
+        return {"rc": 0}
+
+    monkeypatch.setattr(core, "get_info", lambda *_a, **_kw: {"state": "Running", "mounts": {}})
+    monkeypatch.setattr(cli, "run_multipass_command", mock_run)
+    config = types.VMConfig(name="vm1", image="20.04", mounts=[{"source": "/data", "target": "/srv"}])
+    result = core.ensure_present(config)
+
+    assert result["changed"] is True
+    assert result["mounts"] == {"added": ["/srv"], "removed": []}
+    assert commands == [["mount", "/data", "vm1:/srv"]]
+
+
+def test_check_warns_on_unverifiable_mount_type(monkeypatch):
+    """check() surfaces the warning for a kept mount requested as native."""
+    info = {"state": "Running", "mounts": {"/srv": {"source_path": "/data"}}}
+    monkeypatch.setattr(core, "get_info", lambda *_a, **_kw: info)
+    mount = {"source": "/data", "target": "/srv", "type": "native"}
+    result = core.check("vm1", types.VMConfig(name="vm1", image="20.04", mounts=[mount]))
+    assert result["changed"] is False
+    assert "may not be native" in result["warnings"][0]
+
+
+GIB = 1024**3
+
+
+def running_vm(cpus="2", memory=int(3.8 * GIB), disk=int(19.2 * GIB), mounts=None):
+    """Return info for a running VM as multipass reports it."""
+    return {
+        "state": "Running",
+        "cpu_count": cpus,
+        "memory": {"total": memory},
+        "disks": {"sda1": {"total": str(disk)}},
+        "mounts": mounts or {},
+    }
+
+
+def test_plan_create_delete_noop():
+    """plan() derives create, delete and no-op from one snapshot."""
+    snapshot = {"keep": running_vm(), "old": running_vm()}
+    configs = [
+        types.VMConfig(name="keep", image="22.04", cpus=2, memory="4G", disk="20G"),
+        types.VMConfig(name="new", image="22.04", cpus=2),
+    ]
+    entries = core.plan(configs, snapshot, absent=["old", "ghost"])
+    assert [(entry["name"], entry["action"], entry["changed"]) for entry in entries] == [
+        ("keep", "noop", False),
+        ("new", "create", True),
+        ("old", "delete", True),
+        ("ghost", "noop", False),
+    ]
+    assert entries[1]["changes"]["cpus"] == {"before": None, "after": 2}
+
+
+def test_plan_drift_and_mounts():
+    """plan_instance() reports size drift beyond the tolerance without planning a resize."""
+    config = types.VMConfig(
+        name="vm1", image="22.04", cpus=4, memory="8G", disk="10G", mounts=[{"source": "/data", "target": "/srv"}]
+    )
+    entry = core.plan_instance("vm1", config, running_vm())
+    assert entry["action"] == "noop"
+    assert entry["changes"] == {}
+    assert set(entry["drift"]) == {"cpus", "memory"}  # disks never shrink
+    assert entry["mounts"] == {"add": [{"source": "/data", "target": "/srv", "type": "classic"}], "remove": []}
+    assert entry["changed"] is True
+
+    diff = core.render_diff([entry])
+    assert "cpus" not in diff["after"]
+    assert "  mount: /data -> /srv" in diff["after"]
+
+
+def test_plan_skips_sizes_of_stopped_instance():
+    """Sizes a stopped instance does not report are not compared."""
+    config = types.VMConfig(name="vm1", image="22.04", memory="4G", disk="10G")
+    entry = core.plan_instance("vm1", config, {"state": "Stopped", "disks": {"sda1": {}}, "memory": {}})
+    assert entry["drift"] == {}
+    assert entry["changed"] is False
+
+
+def test_check_makes_one_read_only_call(monkeypatch):
+    """check() plans from a single info call and runs nothing mutating."""
+    calls = []
+
+    def mock_run(args, **_kwargs):
+        calls.append(args)
+        return {"json": {"info": {"vm1": running_vm()}}}
+
+    monkeypatch.setattr(cli, "run_multipass_command", mock_run)
+    result = core.check("vm1", None)
+    assert calls == [["info", "vm1", "--format", "json"]]
+    assert result["changed"] is True
+    assert result["msg"] == "VM 'vm1' would be deleted"
+    assert result["diff"] == {"before": "vm1:\n  state: Running\n", "after": "vm1:\n  state: absent\n"}
+
+
+def test_check_validates_cloud_init_without_caching(monkeypatch, tmp_path):
+    """check() validates cloud-init and reports its hash without writing the cache."""
+    monkeypatch.setenv("MULTIPASS_CLOUD_INIT_CACHE", str(tmp_path / "cache"))
+    monkeypatch.setattr(core, "get_info", lambda *_a, **_kw: None)
+    config = types.VMConfig(name="vm1", image="22.04", cloud_init="#cloud-config\npackages: [nginx]\n")
+    result = core.check("vm1", config)
+    assert result["msg"] == "VM 'vm1' would be created"
+    assert result["cloud_init_hash"]
+    assert not (tmp_path / "cache").exists()
+
+
+def test_ensure_present_returns_plan_from_one_info_call(monkeypatch):
+    """ensure_present() plans from the info it read, so a diff needs no second call."""
+    infos = [None, running_vm()]
+    monkeypatch.setattr(core, "get_info", lambda *_a, **_kw: infos.pop(0))
+    monkeypatch.setattr(cli, "run_multipass_command", helpers.mock_success_command)
+    result = core.ensure_present(types.VMConfig(name="vm1", image="22.04"))
+    assert not infos
+    assert [entry["action"] for entry in result["plan"]] == ["create"]
+    assert core.render_diff(result["plan"])["after"] == "vm1:\n  state: present\n  image: 22.04\n"
+
+
+def test_ensure_present_warns_instead_of_resizing(monkeypatch):
+    """ensure_present() reports a size difference on an existing VM without changing it."""
+    commands = []
+
+    def mock_run(args, **_kwargs):
+        commands.append(args)
+        return {"rc": 0}
+
+    monkeypatch.setattr(core, "get_info", lambda *_a, **_kw: running_vm())
+    monkeypatch.setattr(cli, "run_multipass_command", mock_run)
+    result = core.ensure_present(types.VMConfig(name="vm1", image="22.04", cpus=4))
+
+    assert result["changed"] is False
+    assert not commands
+    assert result["warnings"] == ["VM 'vm1' differs from the requested size and was not resized: cpus 2 (requested 4)"]
@@ -0,0 +1,144 @@
+"""Unit tests for multi-hypervisor fleet placement."""
+
+import pytest
+from plugins.module_utils import cli, core, fleet, types
+from tests.helpers import helpers
+
+GIB = 1024**3
+
+
+def make_load(name, instances=None, cpus=None, memory=None):
+    """Build a HostLoad from a fake snapshot of `instances` {name: (cpus, memory bytes)}."""
+    snapshot = {
+        vm: {"state": "Running", "cpu_count": str(vm_cpus), "memory": {"total": vm_memory}}
+        for vm, (vm_cpus, vm_memory) in (instances or {}).items()
+    }
+    return fleet.HostLoad(types.HypervisorConfig(name=name, cpus=cpus, memory=memory), snapshot)
+
+
+def configs(*names, cpus=1, memory="1G"):
+    """Build VMConfigs of one size."""
+    return [types.VMConfig(name=name, image="22.04", cpus=cpus, memory=memory) for name in names]
+
+
+def test_spread_round_robins():
+    """spread places each new instance on the host with the fewest instances."""
+    loads = [make_load("hv1"), make_load("hv2")]
+    placement = fleet.plan_placement(configs("a", "b", "c", "d"), loads, "spread")
+    assert placement == {"a": "hv1", "b": "hv2", "c": "hv1", "d": "hv2"}
+
+
+def test_pack_fills_one_host_first():
+    """pack keeps using the fullest host that still fits."""
+    loads = [make_load("hv1", cpus=2, memory="8G"), make_load("hv2", cpus=8, memory="8G")]
+    placement = fleet.plan_placement(configs("a", "b", "c"), loads, "pack")
+    assert placement == {"a": "hv1", "b": "hv1", "c": "hv2"}
+
+
+def test_least_loaded_uses_existing_load_and_keeps_existing():
+    """least_loaded avoids busy hosts and existing instances are not moved."""
+    loads = [
+        make_load("hv1", {"old": (4, 6 * GIB)}, cpus=8, memory="8G"),
+        make_load("hv2", cpus=8, memory="8G"),
+    ]
+    placement = fleet.plan_placement(configs("old", "new"), loads, "least_loaded")
+    assert placement == {"old": "hv1", "new": "hv2"}
+
+
+def test_stopped_instances_count_at_launch_defaults():
+    """Stopped instances report no size, so they are counted at the launch defaults."""
+    load = fleet.HostLoad(types.HypervisorConfig(name="hv1"), {"old": {"state": "Stopped"}})
+    assert (load.cpus, load.memory) == (fleet.DEFAULT_CPUS, core.parse_size(fleet.DEFAULT_MEMORY))
+
+
+def test_placement_errors():
+    """Unknown strategies and full fleets raise PlacementError."""
+    with pytest.raises(types.PlacementError):
+        fleet.plan_placement(configs("a"), [make_load("hv1")], "random")
+    with pytest.raises(types.PlacementError):
+        fleet.plan_placement(configs("a", cpus=4), [make_load("hv1", cpus=2)], "spread")
+
+
+def test_ensure_fleet_launches_per_hypervisor(monkeypatch):
+    """ensure_fleet reads one snapshot per host and launches on the chosen address."""
+    listed = []
+    launched = []
+
+    def mock_list_instances(module=None, address=None):  # pylint: disable=unused-argument
+        listed.append(address)
+        return {"old": {"state": "Running", "cpu_count": "1"}} if address == "10.0.0.1:50051" else {}
+
+    def mock_ensure_present(config, address=None, **_kwargs):
+        launched.append((config.name, address))
+        return {"changed": True, "msg": "created"}
+
+    monkeypatch.setattr(core, "list_instances", mock_list_instances)
+    monkeypatch.setattr(core, "ensure_present", mock_ensure_present)
+    hypervisors = [
+        types.HypervisorConfig(name="hv1", address="10.0.0.1:50051"),
+        types.HypervisorConfig(name="hv2", address="10.0.0.2:50051"),
+    ]
+    result = fleet.ensure_fleet(configs("new"), hypervisors)
+
+    assert sorted(listed) == ["10.0.0.1:50051", "10.0.0.2:50051"]
+    assert result["placement"] == {"new": {"hypervisor": "hv2", "address": "10.0.0.2:50051"}}
+    assert launched == [("new", "10.0.0.2:50051")]
+    assert result["changed"] is True
+
+
+def test_ensure_fleet_check_mode_does_not_launch(monkeypatch):
+    """Check mode plans placement without calling ensure_present."""
+    monkeypatch.setattr(core, "list_instances", lambda **_kw: {})
+    monkeypatch.setattr(core, "ensure_present", pytest.fail)
+    result = fleet.ensure_fleet(configs("a"), [types.HypervisorConfig(name="local")], check_mode=True)
+    assert result["changed"] is True
+    assert result["placement"] == {"a": {"hypervisor": "local", "address": None}}
+    assert result["instances"] == {}
+    planned = [(entry["name"], entry["action"], entry["hypervisor"]) for entry in result["plan"]]
+    assert planned == [("a", "create", "local")]
+    assert "a:" in result["diff"]["after"]
+
+
+def test_ensure_fleet_check_mode_validates_and_warns(monkeypatch):
+    """Check mode fails instances with invalid cloud-init and reports size drift."""
+    snapshot = {"old": {"state": "Running", "cpu_count": "1"}}
+    monkeypatch.setattr(core, "list_instances", lambda **_kw: snapshot)
+    wanted = [
+        types.VMConfig(name="old", image="22.04", cpus=2),
+        types.VMConfig(name="bad", image="22.04", cloud_init="#cloud-config\npackages: [\n"),
+    ]
+    result = fleet.ensure_fleet(wanted, [types.HypervisorConfig(name="local")], check_mode=True)
+    assert result["failed"] == ["bad"]
+    assert result["instances"]["bad"]["failed"] is True
+    assert result["warnings"] == ["VM 'old' differs from the requested size and was not resized: cpus 1 (requested 2)"]
+
+
+def test_ensure_fleet_collects_listing_errors_without_fail_json(monkeypatch):
+    """A failing hypervisor is reported from the calling thread, not via fail_json in a worker."""
+    dummy = helpers.DummyModule()
+    dummy.params = {}
+    monkeypatch.setattr(cli, "run_multipass_command", helpers.raise_cli_error)
+    hypervisors = [types.HypervisorConfig(name="hv1"), types.HypervisorConfig(name="hv2", address="10.0.0.2:50051")]
+    with pytest.raises(types.MultipassCLIError, match="hv1: .*; hv2: "):
+        fleet.ensure_fleet(configs("a"), hypervisors, module=dummy)
+    assert not dummy.failed
+
+
+def test_ensure_fleet_records_failed_instances(monkeypatch):
+    """An instance that fails to launch is recorded and the others still run."""
+    dummy = helpers.DummyModule()
+    dummy.params = {}
+
+    def mock_ensure_present(config, module=None, **_kwargs):
+        if config.name == "bad":
+            module.fail_json(msg="launch failed")
+        return {"changed": True, "msg": "created"}
+
+    monkeypatch.setattr(core, "list_instances", lambda **_kw: {})
+    monkeypatch.setattr(core, "ensure_present", mock_ensure_present)
+    result = fleet.ensure_fleet(configs("bad", "good"), [types.HypervisorConfig(name="local")], module=dummy)
+
+    assert result["failed"] == ["bad"]
+    assert result["instances"]["bad"] == {"changed": False, "failed": True, "msg": "launch failed"}
+    assert result["instances"]["good"]["changed"] is True
+    assert not dummy.failed
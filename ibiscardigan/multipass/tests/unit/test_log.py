@@ -0,0 +1,65 @@
+"""Unit tests for structured CLI-layer logging."""
+
+from tests.helpers import helpers
+from plugins.module_utils import log
+
+
+def test_truncate_keeps_head_and_tail():
+    """Long payloads keep their head and tail."""
+    text = "a" * 10 + "b" * 100 + "c" * 10
+    truncated = log.truncate(text, 20)
+    assert truncated.startswith("a" * 10)
+    assert truncated.endswith("c" * 10)
+    assert "<100 chars omitted>" in truncated
+    assert log.truncate("short", 20) == "short"
+
+
+def test_redact_args():
+    """Secrets and guest commands are masked."""
+    assert log.redact_args(["set", "local.passphrase=hunter2"]) == ["set", "local.passphrase=<redacted>"]
+    assert log.redact_args(["authenticate", "hunter2"]) == ["authenticate", "<redacted>"]
+    assert log.redact_args(["exec", "vm1", "--", "sh", "-c", "echo secret"]) == [
+        "exec",
+        "vm1",
+        "--",
+        "<3 args <redacted>>",
+    ]
+    assert log.redact_args(["info", "--format", "json"]) == ["info", "--format", "json"]
+
+
+def test_level_from_module_option_overrides_env(monkeypatch):
+    """The module's log_level option wins over the environment variable."""
+    monkeypatch.setenv(log.LEVEL_ENV, "debug")
+    dummy = helpers.DummyModule()
+    dummy.params = {"log_level": "error"}
+    logger = log.get_logger("cli", dummy)
+    logger.info("skipped")
+    logger.error("kept", rc=1)
+    assert dummy.logs == ["[cli] level=error event=kept rc=1"]
+
+
+def test_lazy_fields_and_structured_format(monkeypatch):
+    """Callable fields are only evaluated for emitted records and values are quoted when needed."""
+    monkeypatch.setenv(log.LEVEL_ENV, "info")
+    monkeypatch.setenv(log.MAX_PAYLOAD_ENV, "8")
+    calls = []
+
+    def expensive():
+        calls.append(True)
+        return "value"
+
+    dummy = helpers.DummyModule()
+    logger = log.get_logger("core", dummy)
+    logger.debug("skipped", payload=expensive)
+    assert not calls
+
+    logger.info("vm_create", name="vm 1", args=["stop", "vm1"], payload="0123456789abcdef")
+    assert dummy.logs == [
+        '[core] level=info event=vm_create name="vm 1" args="stop vm1" payload="0123...<8 chars omitted>...cdef"'
+    ]
+
+
+def test_log_level_option_matches_levels():
+    """The shared log_level option offers exactly the known levels."""
+    assert log.log_level_option()["choices"] == list(log.LEVELS)
+    assert log.log_level_option() is not log.log_level_option()
@@ -0,0 +1,70 @@
+"""Unit tests for the instance lookup plugin."""
+
+import pytest
+
+instance = pytest.importorskip("ansible_collections.ibiscardigan.multipass.plugins.lookup.instance")
+errors = pytest.importorskip("ansible.errors")
+
+SNAPSHOT = {
+    "web-1": {"state": "Running", "ipv4": ["10.0.0.1"]},
+    "web-2": {"state": "Running", "ipv4": ["10.0.0.2"]},
+    "db-1": {"state": "Stopped"},
+}
+
+
+@pytest.fixture(name="calls")
+def fixture_calls(monkeypatch):
+    """Serve SNAPSHOT from get_index() and record the arguments it was called with."""
+    calls = []
+
+    def mock_get_index(refresh=False, module=None, address=None):  # pylint: disable=unused-argument
+        calls.append({"refresh": refresh, "address": address})
+        return instance.types.InstanceIndex.from_snapshot(SNAPSHOT)
+
+    monkeypatch.setattr(instance.core, "get_index", mock_get_index)
+    return calls
+
+
+def run(*terms, **kwargs):
+    """Run the lookup as Ansible would."""
+    return instance.LookupModule().run(list(terms), variables={}, **kwargs)
+
+
+def test_lookup_rejects_unknown_options(calls):
+    """Unknown keyword options fail before multipass is queried."""
+    with pytest.raises(errors.AnsibleError, match="attrs, nme"):
+        run("web-1", attrs="ipv4", nme="x")
+    assert not calls
+
+
+@pytest.mark.parametrize("value, expected", [("false", False), ("no", False), ("true", True), (True, True)])
+def test_lookup_parses_refresh_as_boolean(calls, value, expected):
+    """String values of refresh follow Ansible's boolean rules."""
+    run("web-1", refresh=value)
+    assert calls == [{"refresh": expected, "address": None}]
+
+
+def test_lookup_rejects_invalid_refresh(calls):
+    """A refresh value that is not a boolean is an error."""
+    with pytest.raises(errors.AnsibleError, match="refresh"):
+        run("web-1", refresh="sometimes")
+    assert not calls
+
+
+def test_lookup_multiple_terms_and_address(calls):
+    """Every term is matched in turn, against the given daemon address."""
+    assert run("db-*", "web-*", attr="name", address="10.0.0.9:50051") == ["db-1", "web-1", "web-2"]
+    assert calls == [{"refresh": False, "address": "10.0.0.9:50051"}]
+
+
+def test_lookup_by_ip(calls):
+    """ip= selects the instance owning that address, or nothing."""
+    assert run(ip="10.0.0.2", attr="name") == ["web-2"]
+    assert run(ip="10.9.9.9", attr="name") == []
+    assert len(calls) == 2
+
+
+def test_lookup_defaults_to_all_instances(calls):
+    """Without terms every instance is returned with its name."""
+    assert [item["name"] for item in run()] == ["db-1", "web-1", "web-2"]
+    assert len(calls) == 1
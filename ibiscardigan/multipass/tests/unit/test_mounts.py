@@ -0,0 +1,134 @@
+"""Unit tests for mount reconciliation."""
+
+import os
+
+import pytest
+from plugins.module_utils import cli, mounts, types
+
+
+def running_info(current_mounts):
+    """Return info for a running instance with the given raw mounts."""
+    return {"state": "Running", "mounts": current_mounts}
+
+
+def record_commands(monkeypatch):
+    """Capture multipass commands instead of running them."""
+    commands = []
+
+    def mock_run(args, **_kwargs):
+        commands.append(args)
+        return {"rc": 0}
+
+    monkeypatch.setattr(cli, "run_multipass_command", mock_run)
+    return commands
+
+
+def test_plan_mounts_diff():
+    """Only missing or moved mounts are added and unlisted ones removed."""
+    record = types.InstanceRecord(
+        "vm1",
+        running_info(
+            {
+                "/srv/keep": {"source_path": "/data/keep"},
+                "/srv/moved": {"source_path": "/data/old"},
+                "/srv/stale": {"source_path": "/data/stale"},
+            }
+        ),
+    )
+    wanted = [
+        types.MountConfig(source="/data/keep", target="/srv/keep"),
+        types.MountConfig(source="/data/new", target="/srv/moved"),
+        types.MountConfig(source="/data/cache", target="/srv/cache"),
+    ]
+    plan = mounts.plan_mounts(wanted, record)
+    assert [mount.target for mount in plan["add"]] == ["/srv/moved", "/srv/cache"]
+    assert plan["remove"] == ["/srv/stale", "/srv/moved"]
+    assert plan["warnings"] == []
+
+
+def test_plan_mounts_removal_from_running_vm_restarts():
+    """The type of an existing mount is unknown, so removing it from a running VM stops it first."""
+    info = running_info({"/srv": {"source_path": "/data"}})
+    assert mounts.plan_mounts([], types.InstanceRecord("vm1", info))["restart"] is True
+    info["state"] = "Stopped"
+    assert mounts.plan_mounts([], types.InstanceRecord("vm1", info))["restart"] is False
+
+
+def test_plan_mounts_classic_add_keeps_running():
+    """Adding classic mounts alone does not stop a running VM."""
+    record = types.InstanceRecord("vm1", running_info({}))
+    plan = mounts.plan_mounts([types.MountConfig(source="/data", target="/srv")], record)
+    assert plan["restart"] is False
+
+
+def test_plan_mounts_warns_on_unverifiable_native_type():
+    """A kept mount requested as native is left alone with a warning."""
+    record = types.InstanceRecord("vm1", running_info({"/srv": {"source_path": "/data"}}))
+    plan = mounts.plan_mounts([types.MountConfig(source="/data", target="/srv", type="native")], record)
+    assert plan["add"] == [] and plan["remove"] == []
+    assert plan["restart"] is False
+    assert len(plan["warnings"]) == 1 and "'/srv'" in plan["warnings"][0]
+
+
+def test_ensure_mounts_noop(monkeypatch):
+    """No commands run when mounts already match."""
+    commands = record_commands(monkeypatch)
+    info = running_info({"/srv": {"source_path": "/data"}})
+    result = mounts.ensure_mounts("vm1", [types.MountConfig(source="/data", target="/srv")], info)
+    assert result == {"changed": False, "added": [], "removed": [], "warnings": []}
+    assert not commands
+
+
+def test_ensure_mounts_native_changes_share_one_restart(monkeypatch):
+    """All of one VM's native mount changes happen inside one stop/start."""
+    commands = record_commands(monkeypatch)
+    info = running_info({"/srv/stale": {"source_path": "/data/stale"}})
+    wanted = [
+        types.MountConfig(source="/data/a", target="/srv/a", type="native"),
+        types.MountConfig(source="/data/b", target="/srv/b", type="native"),
+    ]
+    result = mounts.ensure_mounts("vm1", wanted, info)
+
+    assert result == {"changed": True, "added": ["/srv/a", "/srv/b"], "removed": ["/srv/stale"], "warnings": []}
+    assert commands == [
+        ["stop", "vm1"],
+        ["umount", "vm1:/srv/stale"],
+        ["mount", "--type", "native", "/data/a", "vm1:/srv/a"],
+        ["mount", "--type", "native", "/data/b", "vm1:/srv/b"],
+        ["start", "vm1"],
+    ]
+
+
+def test_plan_mounts_resolves_symlinked_source(tmp_path):
+    """A source reached through a symlink matches the resolved path multipass reports."""
+    real = tmp_path / "real"
+    real.mkdir()
+    link = tmp_path / "link"
+    link.symlink_to(real)
+    record = types.InstanceRecord("vm1", running_info({"/srv": {"source_path": os.path.realpath(real)}}))
+    plan = mounts.plan_mounts([types.MountConfig(source=str(link), target="/srv")], record)
+    assert plan == {"add": [], "remove": [], "restart": False, "warnings": []}
+
+
+def test_ensure_mounts_restarts_after_failure(monkeypatch):
+    """A failing mount command still starts the VM that was stopped for it."""
+    commands = []
+
+    def mock_run(args, **_kwargs):
+        commands.append(args)
+        if args[0] == "mount":
+            raise types.MultipassCLIError("mount failed")
+        return {"rc": 0}
+
+    monkeypatch.setattr(cli, "run_multipass_command", mock_run)
+    wanted = [types.MountConfig(source="/data/a", target="/srv/a", type="native")]
+    with pytest.raises(types.MultipassCLIError):
+        mounts.ensure_mounts("vm1", wanted, running_info({}))
+    assert commands[0] == ["stop", "vm1"]
+    assert commands[-1] == ["start", "vm1"]
+
+
+def test_vmconfig_converts_mount_dicts():
+    """VMConfig accepts mount dicts as passed by the modules."""
+    config = types.VMConfig(name="vm1", image="22.04", mounts=[{"source": "/data", "target": "/srv"}])
+    assert config.mounts == [types.MountConfig(source="/data", target="/srv", type="classic")]
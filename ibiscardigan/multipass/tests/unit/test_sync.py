@@ -0,0 +1,105 @@
+"""Unit tests for content-hash file sync."""
+
+import hashlib
+import io
+import tarfile
+
+from plugins.module_utils import cli, sync, types
+
+
+def make_tree(tmp_path):
+    """Create a small source tree and return its path as a string."""
+    (tmp_path / "conf").mkdir()
+    (tmp_path / "a.txt").write_text("alpha")
+    (tmp_path / "conf" / "b.txt").write_text("bravo")
+    return str(tmp_path)
+
+
+def sha(text):
+    """Return the sha256 hex digest of a string."""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def test_hash_tree(tmp_path):
+    """hash_tree() returns relative POSIX paths with digest and size."""
+    src = make_tree(tmp_path)
+    assert sync.hash_tree(src) == {"a.txt": (sha("alpha"), 5), "conf/b.txt": (sha("bravo"), 5)}
+
+
+def test_remote_hashes_parses_sha256sum(monkeypatch):
+    """remote_hashes() parses sha256sum output and skips escaped names."""
+    stdout = f"{sha('alpha')}  ./a.txt\n\\{sha('x')}  ./we\\\\ird\n{sha('bravo')}  ./conf/b.txt"
+    monkeypatch.setattr(cli, "run_multipass_command", lambda *_a, **_kw: {"rc": 0, "stdout": stdout})
+    assert sync.remote_hashes("vm1", "/etc/app") == {"a.txt": sha("alpha"), "conf/b.txt": sha("bravo")}
+
+
+def test_sync_instance_sends_only_changed(monkeypatch, tmp_path):
+    """sync_instance() streams a tar of only the files whose hash differs."""
+    src = make_tree(tmp_path)
+    sent = []
+
+    def mock_run(args, **kwargs):
+        if kwargs.get("stdin") is not None:
+            sent.append((args, kwargs["stdin"].read()))
+            return {"rc": 0, "stdout": ""}
+        return {"rc": 0, "stdout": f"{sha('alpha')}  ./a.txt\n{sha('stale')}  ./conf/b.txt"}
+
+    monkeypatch.setattr(cli, "run_multipass_command", mock_run)
+    result = sync.sync_instance("vm1", src, "/etc/app", sync.hash_tree(src))
+
+    assert result == {"changed": True, "files_sent": 1, "files_skipped": 1, "bytes_sent": 5, "bytes_skipped": 5}
+    assert len(sent) == 1
+    args, data = sent[0]
+    assert args[:3] == ["exec", "vm1", "--"]
+    with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+        assert tar.getnames() == ["conf/b.txt"]
+        assert tar.extractfile("conf/b.txt").read() == b"bravo"
+
+
+def test_sync_instances_unchanged_and_check_mode(monkeypatch, tmp_path):
+    """sync_instances() reports totals and never transfers in check mode."""
+    src = make_tree(tmp_path)
+    transfers = []
+
+    def mock_run(args, **kwargs):
+        if kwargs.get("stdin") is not None:
+            transfers.append(args)
+        if args[1] == "vm1":
+            return {"rc": 0, "stdout": f"{sha('alpha')}  ./a.txt\n{sha('bravo')}  ./conf/b.txt"}
+        return {"rc": 0, "stdout": ""}
+
+    monkeypatch.setattr(cli, "run_multipass_command", mock_run)
+    result = sync.sync_instances(["vm1", "vm2"], src, "/etc/app", check_mode=True)
+
+    assert result["changed"] is True
+    assert result["instances"]["vm1"]["changed"] is False
+    assert result["instances"]["vm2"]["files_sent"] == 2
+    assert result["bytes_sent"] == 10
+    assert result["bytes_skipped"] == 10
+    assert not transfers
+
+
+def test_sync_instances_records_failures(monkeypatch, tmp_path):
+    """sync_instances() records a failing instance and still syncs the others."""
+    src = make_tree(tmp_path)
+
+    def mock_run(args, **_kwargs):
+        if args[1] == "vm2":
+            raise types.MultipassCLIError("exec failed")
+        return {"rc": 0, "stdout": f"{sha('alpha')}  ./a.txt\n{sha('bravo')}  ./conf/b.txt"}
+
+    monkeypatch.setattr(cli, "run_multipass_command", mock_run)
+    result = sync.sync_instances(["vm1", "vm2"], src, "/etc/app")
+
+    assert result["failed"] == ["vm2"]
+    assert result["instances"]["vm2"] == {"changed": False, "failed": True, "msg": "exec failed"}
+    assert result["instances"]["vm1"]["files_skipped"] == 2
+    assert result["changed"] is False
+    assert result["bytes_skipped"] == 10
+
+
+def test_hash_tree_reads_large_files_in_chunks(monkeypatch, tmp_path):
+    """hash_tree() hashes files larger than one chunk correctly."""
+    monkeypatch.setattr(sync, "_CHUNK_SIZE", 4)
+    (tmp_path / "big.txt").write_text("0123456789")
+    assert sync.hash_tree(str(tmp_path)) == {"big.txt": (sha("0123456789"), 10)}
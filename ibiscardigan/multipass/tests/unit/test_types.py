@@ -0,0 +1,72 @@
+"""Unit tests for shared instance record types."""
+
+from plugins.module_utils import types
+
+
+def sample_snapshot():
+    """Return a small `multipass info` snapshot."""
+    return {
+        "web-1": {
+            "state": "Running",
+            "ipv4": ["10.0.0.1", "172.17.0.1"],
+            "cpu_count": "2",
+            "memory": {"total": 2061000000, "used": "150000000"},
+            "disks": {"sda1": {"total": "10000000000", "used": "2000000000"}},
+            "mounts": {"/srv/cache": {"source_path": "/data/cache", "gid_mappings": ["0:default"]}},
+        },
+        "web-2": {"state": "Running", "ipv4": ["10.0.0.2"]},
+        "db-1": {"state": "Stopped", "ipv4": []},
+    }
+
+
+def test_instance_record_fields():
+    """InstanceRecord keeps normalised scalars, sizes and mounts."""
+    record = types.InstanceRecord("web-1", sample_snapshot()["web-1"])
+    assert record.state == "Running"
+    assert record.ipv4 == ("10.0.0.1", "172.17.0.1")
+    assert record.cpu_count == 2
+    assert record.memory_total == 2061000000
+    assert record.disk_total == 10000000000
+    assert record.mounts == {"/srv/cache": {"source": "/data/cache"}}
+    assert record.get("missing", "x") == "x"
+    assert not hasattr(record, "__dict__")
+
+
+def test_instance_record_to_dict_keeps_only_known_fields():
+    """to_dict() returns the record fields, not the raw info it was built from."""
+    info = {**sample_snapshot()["web-1"], "image_release": "22.04 LTS"}
+    record = types.InstanceRecord("web-1", info)
+    info.clear()
+    assert record.to_dict() == {
+        "state": "Running",
+        "ipv4": ["10.0.0.1", "172.17.0.1"],
+        "cpu_count": 2,
+        "memory_total": 2061000000,
+        "disk_total": 10000000000,
+        "mounts": {"/srv/cache": {"source": "/data/cache"}},
+    }
+    assert record.get("image_release") is None
+
+
+def test_instance_record_defaults_for_sparse_info():
+    """InstanceRecord tolerates stopped instances with missing fields."""
+    record = types.InstanceRecord("db-1", {"state": "Stopped", "disks": {"sda1": {}}, "memory": {}})
+    assert record.ipv4 == ()
+    assert record.cpu_count is None
+    assert record.mounts == {}
+    assert record.memory_total is None
+    assert record.disk_total is None
+
+
+def test_instance_index_lookups():
+    """InstanceIndex resolves names, IPs and states."""
+    index = types.InstanceIndex.from_snapshot(sample_snapshot())
+    assert len(index) == 3
+    assert "web-2" in index
+    assert index.get("db-1").state == "Stopped"
+    assert index.get("ghost") is None
+    assert index.by_ip("172.17.0.1").name == "web-1"
+    assert index.by_ip("10.9.9.9") is None
+    assert sorted(record.name for record in index.by_state("Running")) == ["web-1", "web-2"]
+    assert index.by_state("Deleted") == []
+    assert sorted(index.names()) == ["db-1", "web-1", "web-2"]